@@ -0,0 +1,111 @@
+import hashlib
+import os
+import pickle
+
+import joblib
+
+# ========================================
+# MODEL ARTIFACT LOCATIONS
+# ========================================
+# models/                      - artifacts from the last full training run
+# models/versions/v0001/ ...   - artifacts written by incremental updates
+# models/versions/LATEST       - name of the version the app should serve
+# models/segments/<name>/      - the same layout for one industry segment
+# training_rows.npz            - the raw rows and labels the models in that folder were fit on
+
+MODELS_DIR = "models"
+VERSIONS_DIR = os.path.join(MODELS_DIR, "versions")
+SEGMENTS_DIR = os.path.join(MODELS_DIR, "segments")
+LATEST_FILE = "LATEST"
+DEFAULT_SEGMENT = "general"
+BASE_VERSION = "base"
+TRAINING_ROWS_FILE = "training_rows.npz"
+
+
+def load_pickle_or_joblib(path):
+    """Load a model file saved with joblib, falling back to plain pickle"""
+    try:
+        return joblib.load(path)
+    except Exception:
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+
+
+def fingerprint_files(*paths):
+    """Short content hash identifying a set of artifact files (missing files are skipped)"""
+    digest = hashlib.sha256()
+    for path in paths:
+        if path and os.path.exists(path):
+            with open(path, 'rb') as file:
+                digest.update(file.read())
+    return digest.hexdigest()[:16]
+
+
+def latest_models_dir(models_dir=MODELS_DIR):
+    """Directory of the newest versioned artifacts, or models_dir if there are none"""
+    versions_dir = os.path.join(models_dir, "versions")
+    latest_file = os.path.join(versions_dir, LATEST_FILE)
+    if os.path.exists(latest_file):
+        with open(latest_file) as file:
+            version = file.read().strip()
+        version_dir = os.path.join(versions_dir, version)
+        if version and os.path.isdir(version_dir):
+            return version_dir
+    return models_dir
+
+
+def next_version_dir(models_dir=MODELS_DIR):
+    """Create and return the directory for the next artifact version"""
+    versions_dir = os.path.join(models_dir, "versions")
+    os.makedirs(versions_dir, exist_ok=True)
+    existing = [name for name in os.listdir(versions_dir) if name.startswith('v') and name[1:].isdigit()]
+    number = max((int(name[1:]) for name in existing), default=0) + 1
+    version_dir = os.path.join(versions_dir, f"v{number:04d}")
+    os.makedirs(version_dir)
+    return version_dir
+
+
+def publish_version(version_dir, models_dir=MODELS_DIR):
+    """Point LATEST at version_dir so newly started app sessions load it"""
+    versions_dir = os.path.join(models_dir, "versions")
+    tmp_file = os.path.join(versions_dir, LATEST_FILE + ".tmp")
+    with open(tmp_file, 'w') as file:
+        file.write(os.path.basename(version_dir))
+    os.replace(tmp_file, os.path.join(versions_dir, LATEST_FILE))
+
+
+def clear_latest(models_dir=MODELS_DIR):
+    """Remove LATEST so the app serves models_dir itself; returns True if there was one"""
+    latest_file = os.path.join(models_dir, "versions", LATEST_FILE)
+    if not os.path.exists(latest_file):
+        return False
+    os.remove(latest_file)
+    return True
+
+
+def model_segments(models_dir=MODELS_DIR):
+    """Segment name -> artifact root; DEFAULT_SEGMENT is models_dir itself"""
+    segments = {DEFAULT_SEGMENT: models_dir}
+    segments_dir = os.path.join(models_dir, "segments")
+    if os.path.isdir(segments_dir):
+        for name in sorted(os.listdir(segments_dir)):
+            if os.path.isdir(os.path.join(segments_dir, name)) and name != DEFAULT_SEGMENT:
+                segments[name] = os.path.join(segments_dir, name)
+    return segments
+
+
+def model_versions(segment_dir):
+    """Version name -> directory under one artifact root, oldest first (BASE_VERSION is the root itself)"""
+    versions = {BASE_VERSION: segment_dir}
+    versions_dir = os.path.join(segment_dir, "versions")
+    if os.path.isdir(versions_dir):
+        for name in sorted(os.listdir(versions_dir)):
+            if name.startswith('v') and name[1:].isdigit() and os.path.isdir(os.path.join(versions_dir, name)):
+                versions[name] = os.path.join(versions_dir, name)
+    return versions
+
+
+def artifact_bytes(models_dir):
+    """Total size of the model files (.pkl / .npz) directly in models_dir"""
+    return sum(entry.stat().st_size for entry in os.scandir(models_dir)
+               if entry.is_file() and entry.name.endswith(('.pkl', '.npz')))
@@ -0,0 +1,183 @@
+"""Append-only audit log of every prediction.
+
+Records are fixed-size binary rows (a NumPy structured dtype) appended by a
+background thread, so the button handler only puts a tuple on a bounded
+queue. Each file starts with a small header describing the row layout and
+model names, and a new file is started when the current one reaches
+max_bytes or max_age_seconds. If the disk falls behind and the queue fills
+up, records are dropped and counted in metrics ("audit.dropped") rather
+than slowing predictions down. Each record says whether its probability
+was scored exactly or interpolated from the dense slider grid.
+
+Read the logs back with:
+    python audit.py                      # summary of audit_logs/
+    python audit.py --csv audit.csv      # export every record
+"""
+import argparse
+import glob
+import json
+import os
+import struct
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from background_writer import BackgroundWriter
+from features import BASIC_FEATURES
+from model_registry import MODEL_CHOICES
+
+AUDIT_DIR = "audit_logs"
+AUDIT_MAGIC = b"BKAUDIT1"
+AUDIT_MODELS = list(MODEL_CHOICES)
+AUDIT_SOURCES = ['exact', 'interpolated']
+AUDIT_DTYPE = np.dtype([
+    ('ts', '<f8'),
+    ('session', 'S16'),
+    ('model', 'u1'),
+    ('fingerprint', 'S16'),
+    ('inputs', '<f8', (len(BASIC_FEATURES),)),
+    ('bankruptcy_prob', '<f8'),
+    ('prediction', 'i1'),
+    ('latency_ms', '<f4'),
+    ('source', 'u1'),
+])
+
+
+def _header():
+    description = json.dumps({
+        'dtype': AUDIT_DTYPE.descr,
+        'models': AUDIT_MODELS,
+        'sources': AUDIT_SOURCES,
+        'features': BASIC_FEATURES,
+    }).encode('utf-8')
+    return AUDIT_MAGIC + struct.pack('<I', len(description)) + description
+
+
+class AuditLog:
+    """Rotating binary audit log written through a BackgroundWriter"""
+
+    def __init__(self, directory=AUDIT_DIR, max_bytes=64 * 1024 * 1024, max_age_seconds=24 * 3600,
+                 max_queue=10000, fsync=True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.fsync = fsync
+        self._file = None
+        self._opened_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+        self._writer = BackgroundWriter(self._write_batch, "audit", max_queue)
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        number = len(glob.glob(os.path.join(self.directory, "audit-*.bin")))
+        path = os.path.join(self.directory, f"audit-{stamp}-{number:04d}.bin")
+        self._file = open(path, 'ab')
+        self._file.write(_header())
+        self._opened_at = time.time()
+
+    def _write_batch(self, records):
+        if (self._file is None or self._file.tell() >= self.max_bytes
+                or time.time() - self._opened_at >= self.max_age_seconds):
+            self._rotate()
+        self._file.write(np.array(records, dtype=AUDIT_DTYPE).tobytes())
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def record(self, session, model, fingerprint, inputs, bankruptcy_prob, prediction, latency_ms, source='exact'):
+        """Queue one prediction; returns False if it was dropped"""
+        return self._writer.submit((
+            time.time(),
+            (session or "")[:16].encode('ascii', 'replace'),
+            AUDIT_MODELS.index(model),
+            (fingerprint or "").encode('ascii'),
+            [float(inputs[factor]) for factor in BASIC_FEATURES],
+            float(bankruptcy_prob),
+            int(prediction),
+            float(latency_ms),
+            AUDIT_SOURCES.index(source),
+        ))
+
+    def close(self):
+        self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+# ========================================
+# READER
+# ========================================
+
+def read_audit_file(path):
+    """Records of one audit file as a structured array and its header description"""
+    with open(path, 'rb') as file:
+        data = file.read()
+    if not data.startswith(AUDIT_MAGIC):
+        raise ValueError(f"{path} is not an audit log")
+    offset = len(AUDIT_MAGIC)
+    (length,) = struct.unpack_from('<I', data, offset)
+    offset += 4
+    description = json.loads(data[offset:offset + length])
+    offset += length
+    dtype = np.dtype([tuple(field) if len(field) == 2 else (field[0], field[1], tuple(field[2]))
+                      for field in description['dtype']])
+    # A crash mid-write can leave a partial last record; ignore it
+    n_records = (len(data) - offset) // dtype.itemsize
+    return np.frombuffer(data, dtype=dtype, count=n_records, offset=offset), description
+
+
+def read_audit_log(path=AUDIT_DIR):
+    """All audit records under a directory (or in one file) as a DataFrame, oldest first"""
+    if os.path.isdir(path):
+        paths = sorted(glob.glob(os.path.join(path, "audit-*.bin")))
+    else:
+        paths = [path] if os.path.exists(path) else []
+    frames = []
+    for file_path in paths:
+        records, description = read_audit_file(file_path)
+        models = description['models']
+        frame = pd.DataFrame({
+            'time': pd.to_datetime(records['ts'], unit='s'),
+            'session': [value.decode('ascii') for value in records['session']],
+            'model': [models[code] for code in records['model']],
+            'fingerprint': [value.decode('ascii') for value in records['fingerprint']],
+        })
+        frame[BASIC_FEATURES] = records['inputs']
+        frame['bankruptcy_prob'] = records['bankruptcy_prob']
+        frame['prediction'] = records['prediction'].astype(int)
+        frame['latency_ms'] = records['latency_ms'].astype(float)
+        # Files from before the source field only hold exact scores
+        if 'source' in records.dtype.names:
+            frame['source'] = [description['sources'][code] for code in records['source']]
+        else:
+            frame['source'] = 'exact'
+        frame['file'] = os.path.basename(file_path)
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=['time', 'session', 'model', 'fingerprint'] + BASIC_FEATURES
+                            + ['bankruptcy_prob', 'prediction', 'latency_ms', 'source', 'file'])
+    return pd.concat(frames, ignore_index=True).sort_values('time', kind='stable').reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read the prediction audit log")
+    parser.add_argument('path', nargs='?', default=AUDIT_DIR, help="Audit directory or file")
+    parser.add_argument('--csv', default=None, help="Export every record to this CSV")
+    args = parser.parse_args()
+
+    records = read_audit_log(args.path)
+    print(f"📋 {len(records)} audited predictions in {records['file'].nunique()} files")
+    if len(records):
+        print(f"   From {records['time'].min()} to {records['time'].max()}")
+        print(records.groupby(['model', 'source'])['bankruptcy_prob'].describe()[['count', 'mean', 'min', 'max']].to_string())
+    if args.csv:
+        records.to_csv(args.csv, index=False)
+        print(f"✅ Saved {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
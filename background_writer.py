@@ -0,0 +1,69 @@
+import atexit
+import queue
+import threading
+
+import metrics
+
+# ========================================
+# BACKGROUND WRITER
+# ========================================
+# Request handlers hand records to a bounded queue and return immediately; a
+# daemon thread drains the queue in batches and passes each batch to a sink.
+# When the queue is full the record is dropped and counted instead of
+# blocking the request.
+
+
+class BackgroundWriter:
+    """Bounded queue drained by a background thread into sink(batch)"""
+
+    def __init__(self, sink, name, max_queue=10000, flush_interval=1.0, max_batch=1000):
+        self.sink = sink
+        self.name = name
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"{name}-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, record):
+        """Queue a record without blocking; returns False if it had to be dropped"""
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            metrics.increment(f"{self.name}.dropped")
+            return False
+
+    def _drain(self, first=None):
+        batch = [] if first is None else [first]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            try:
+                self.sink(batch)
+                metrics.increment(f"{self.name}.written", len(batch))
+            except Exception:
+                metrics.increment(f"{self.name}.write_errors")
+                metrics.increment(f"{self.name}.dropped", len(batch))
+        return len(batch)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._drain(first)
+        while self._drain():
+            pass
+
+    def close(self):
+        """Write everything still queued and stop the thread"""
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join()
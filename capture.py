@@ -0,0 +1,71 @@
+"""Optional capture of scoring requests to a JSON-lines file.
+
+Start the app with BANKRUPTCY_CAPTURE=1 (writes requests.jsonl) or
+BANKRUPTCY_CAPTURE=path/to/file.jsonl. Each prediction becomes one compact
+line with the time, model, model fingerprint, the 6 inputs, the scoring
+latency, the result and whether it was scored exactly or interpolated
+from the dense slider grid. Lines are written by a background thread, so the
+button handler never waits on the disk. replay.py re-runs a captured file.
+"""
+import json
+import os
+import time
+
+from background_writer import BackgroundWriter
+from features import BASIC_FEATURES
+
+CAPTURE_FILE = "requests.jsonl"
+
+
+def capture_path_from_env(value):
+    """Capture file for a BANKRUPTCY_CAPTURE value, or None when capture is off"""
+    if not value or value == "0":
+        return None
+    return CAPTURE_FILE if value == "1" else value
+
+
+class TrafficCapture:
+    """Appends one JSON line per scoring request via a BackgroundWriter"""
+
+    def __init__(self, path=CAPTURE_FILE, max_queue=10000, flush_interval=1.0):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._writer = BackgroundWriter(self._write_batch, "capture", max_queue, flush_interval)
+
+    def _write_batch(self, records):
+        self._file.write("".join(json.dumps(record, separators=(',', ':')) + "\n" for record in records))
+        self._file.flush()
+
+    def record(self, model, fingerprint, inputs, latency_ms, bankruptcy_prob, prediction, source='exact'):
+        """Queue one request (inputs is a mapping or Series with the 6 raw inputs)"""
+        return self._writer.submit({
+            'ts': round(time.time(), 3),
+            'model': model,
+            'fingerprint': fingerprint,
+            'inputs': [float(inputs[factor]) for factor in BASIC_FEATURES],
+            'latency_ms': round(float(latency_ms), 3),
+            'bankruptcy_prob': float(bankruptcy_prob),
+            'prediction': int(prediction),
+            'source': source,
+        })
+
+    def close(self):
+        self._writer.close()
+        self._file.close()
+
+
+def read_capture(path):
+    """Captured requests in file order; lines that do not parse are skipped"""
+    records = []
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and len(record.get('inputs', [])) == len(BASIC_FEATURES):
+                records.append(record)
+    return records
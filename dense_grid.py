@@ -0,0 +1,222 @@
+"""Dense probability grid for continuous (slider) inputs.
+
+Usage:
+    python dense_grid.py                          # every model, 11 points per factor (0.1 apart)
+    python dense_grid.py --model ensemble --points 21 --dtype float32
+    python dense_grid.py --models-dir models/versions/v0002 --runtime numpy
+
+Each factor is sampled at --points evenly spaced values from 0 to 1 and the
+bankruptcy probability of every combination is scored once, in chunks, into
+dense_grid_<model>.npy next to the models. The app memory-maps that file and
+answers slider inputs by multilinear interpolation between the 64 surrounding
+grid points, so no model runs on the request path. After building, random
+slider inputs (0.05 apart) are scored exactly and compared with the
+interpolation; that accuracy report is saved in dense_grid_<model>.json and
+decides when the app falls back to exact scoring.
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from artifacts import fingerprint_files, latest_models_dir
+from features import BASIC_FEATURES
+from model_registry import MODEL_CHOICES, get_models
+from scoring import prepare_input, risk_levels, risk_thresholds
+
+DENSE_GRID_POINTS = 11
+DENSE_GRID_DTYPE = 'float16'
+SLIDER_STEP = 0.05
+# Grids that give the exact risk level less often than this are not served
+DENSE_GRID_MIN_AGREEMENT = 0.95
+ACCURACY_SAMPLES = 2000
+BUILD_CHUNK_ROWS = 50000
+LOOKUP_CHUNK_ROWS = 32768
+
+# Offsets of the 2^6 corners around a point (bit i set = upper neighbor on factor i)
+_CORNERS = (np.arange(2 ** len(BASIC_FEATURES))[:, None] >> np.arange(len(BASIC_FEATURES))[None, :]) & 1
+
+
+# Files a grid depends on, whichever runtime scores it (the NumPy export gives the same probabilities);
+# the student scores off-grid points with the ensemble
+MODEL_FILES = {
+    'ensemble': ("ensemble_model.pkl",),
+    'knn': ("best_model_knn.pkl",),
+    'student': ("student_model.pkl", "ensemble_model.pkl"),
+}
+
+
+def grid_fingerprint(models_dir, model_name):
+    """Content hash of the model and scaler files behind a grid"""
+    return fingerprint_files(*(os.path.join(models_dir, name) for name in MODEL_FILES[model_name]),
+                             os.path.join(models_dir, "feature_scaler.pkl"))
+
+
+def dense_grid_paths(models_dir, model_name):
+    """(.npy grid, .json report) file names for one model choice"""
+    base = os.path.join(models_dir, f"dense_grid_{model_name}")
+    return base + ".npy", base + ".json"
+
+
+class DenseGrid:
+    """Memory-mapped bankruptcy probabilities with multilinear interpolation"""
+
+    def __init__(self, values, report=None):
+        self.points = values.shape[0]
+        self.values = values.reshape(-1)
+        self.report = report or {}
+        self.strides = self.points ** np.arange(len(BASIC_FEATURES) - 1, -1, -1)
+        self.corner_offsets = _CORNERS @ self.strides
+
+    @classmethod
+    def load(cls, models_dir, model_name):
+        """Grid for a model choice, or None if it is missing or was built for other model files"""
+        grid_file, report_file = dense_grid_paths(models_dir, model_name)
+        if not (os.path.exists(grid_file) and os.path.exists(report_file)):
+            return None
+        with open(report_file) as file:
+            report = json.load(file)
+        if report.get('fingerprint') != grid_fingerprint(models_dir, model_name):
+            return None
+        return cls(np.load(grid_file, mmap_mode='r'), report)
+
+    @property
+    def usable(self):
+        """True when the accuracy report says interpolation is close enough to serve"""
+        return self.report.get('risk_level_agreement', 0.0) >= DENSE_GRID_MIN_AGREEMENT
+
+    def bankruptcy_prob(self, raw):
+        """Interpolated bankruptcy probability for an (n, 6) array of raw inputs"""
+        raw = np.atleast_2d(np.asarray(raw, dtype=np.float64))
+        result = np.empty(len(raw))
+        # Chunks keep the (rows x 64 corners) work arrays small for large batches
+        for start in range(0, len(raw), LOOKUP_CHUNK_ROWS):
+            chunk = raw[start:start + LOOKUP_CHUNK_ROWS]
+            position = np.clip(chunk, 0.0, 1.0) * (self.points - 1)
+            lower = np.clip(np.floor(position), 0, self.points - 2).astype(np.int64)
+            fraction = position - lower
+            corner_values = self.values[(lower @ self.strides)[:, None] + self.corner_offsets]
+            # Collapse one factor at a time: the last axis holds bit 0 (factor 0), and so on
+            corner_values = corner_values.astype(np.float64).reshape((len(chunk),) + (2,) * len(BASIC_FEATURES))
+            for j in range(len(BASIC_FEATURES)):
+                f = fraction[:, j].reshape((-1,) + (1,) * (len(BASIC_FEATURES) - j - 1))
+                corner_values = corner_values[..., 0] + (corner_values[..., 1] - corner_values[..., 0]) * f
+            result[start:start + LOOKUP_CHUNK_ROWS] = corner_values
+        return result
+
+    def near_cutoff(self, bankruptcy_prob, thresholds):
+        """True where the interpolation error (99th percentile) could cross a risk cutoff"""
+        margin = self.report.get('p99_abs_error', np.inf)
+        distance = np.min(np.abs(np.subtract.outer(np.atleast_1d(bankruptcy_prob), thresholds)), axis=1)
+        return distance <= margin
+
+
+# ========================================
+# BUILD AND ACCURACY REPORT
+# ========================================
+
+def grid_rows(points, start, stop):
+    """Raw inputs of flat grid cells start..stop-1 (first factor varies slowest)"""
+    levels = np.stack(np.unravel_index(np.arange(start, stop), (points,) * len(BASIC_FEATURES)), axis=1)
+    return pd.DataFrame(levels / (points - 1), columns=BASIC_FEATURES)
+
+
+def build_dense_grid(model, metadata, scaler, path, points=DENSE_GRID_POINTS, dtype=DENSE_GRID_DTYPE,
+                     chunk_rows=BUILD_CHUNK_ROWS, progress=None):
+    """Score every grid point into a .npy file at path (written to a temporary file, then moved)"""
+    n_cells = points ** len(BASIC_FEATURES)
+    tmp_path = path + ".tmp.npy"
+    values = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=(points,) * len(BASIC_FEATURES))
+    flat = values.reshape(-1)
+    for start in range(0, n_cells, chunk_rows):
+        stop = min(start + chunk_rows, n_cells)
+        flat[start:stop] = model.predict_proba(prepare_input(grid_rows(points, start, stop), metadata, scaler))[:, 0]
+        if progress:
+            progress(stop, n_cells)
+    values.flush()
+    del values, flat
+    os.replace(tmp_path, path)
+
+
+def accuracy_report(grid, model, metadata, scaler, n_samples=ACCURACY_SAMPLES, step=SLIDER_STEP, seed=0):
+    """Interpolation error against exact scoring on random slider inputs"""
+    rng = np.random.default_rng(seed)
+    n_steps = int(round(1 / step))
+    raw = rng.integers(0, n_steps + 1, size=(n_samples, len(BASIC_FEATURES))) * step
+    exact = model.predict_proba(prepare_input(pd.DataFrame(raw, columns=BASIC_FEATURES), metadata, scaler))[:, 0]
+    start = time.perf_counter()
+    interpolated = grid.bankruptcy_prob(raw)
+    lookup_us = (time.perf_counter() - start) / n_samples * 1e6
+    error = np.abs(interpolated - exact)
+    thresholds = risk_thresholds(metadata)
+    return {
+        'samples': n_samples,
+        'max_abs_error': float(error.max()),
+        'mean_abs_error': float(error.mean()),
+        'p99_abs_error': float(np.quantile(error, 0.99)),
+        'risk_level_agreement': float((risk_levels(interpolated, thresholds) == risk_levels(exact, thresholds)).mean()),
+        'lookup_us_per_row': round(lookup_us, 3),
+    }
+
+
+def build_model_grid(models, model_name, models_dir, points=DENSE_GRID_POINTS, dtype=DENSE_GRID_DTYPE):
+    """Build, check and save the grid of one model choice; returns its report"""
+    model, metadata = models.choice(model_name)
+    grid_file, report_file = dense_grid_paths(models_dir, model_name)
+    start = time.perf_counter()
+    build_dense_grid(model, metadata, models.scaler, grid_file, points, dtype,
+                     progress=lambda done, total: print(f"   {model_name}: {done}/{total} points", end="\r"))
+    build_seconds = time.perf_counter() - start
+    grid = DenseGrid(np.load(grid_file, mmap_mode='r'))
+    report = accuracy_report(grid, model, metadata, models.scaler)
+    report.update({
+        'model': model_name,
+        'fingerprint': grid_fingerprint(models_dir, model_name),
+        'points': points,
+        'dtype': dtype,
+        'bytes': os.path.getsize(grid_file),
+        'build_seconds': round(build_seconds, 1),
+        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    })
+    with open(report_file, 'w') as file:
+        json.dump(report, file, indent=2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute dense probability grids for continuous inputs")
+    parser.add_argument('--models-dir', default=None, help="Model artifacts (default: the version the app serves)")
+    parser.add_argument('--model', choices=list(MODEL_CHOICES), action='append', default=None,
+                        help="Model to build (repeatable, default: every loaded model)")
+    parser.add_argument('--points', type=int, default=DENSE_GRID_POINTS,
+                        help="Values per factor from 0 to 1 (11 = every 0.1; 21 = every 0.05)")
+    parser.add_argument('--dtype', choices=['float16', 'float32'], default=DENSE_GRID_DTYPE)
+    parser.add_argument('--runtime', choices=['sklearn', 'numpy'], default='sklearn')
+    args = parser.parse_args()
+    if args.points < 2:
+        raise SystemExit("❌ --points must be at least 2")
+
+    models_dir = args.models_dir or latest_models_dir()
+    models = get_models(models_dir, args.runtime)
+    if models.error:
+        raise SystemExit(f"❌ Could not load models:\n{models.error}")
+    for model_name in args.model or list(MODEL_CHOICES):
+        if models.choice(model_name)[0] is None:
+            continue
+        report = build_model_grid(models, model_name, models_dir, args.points, args.dtype)
+        served = report['risk_level_agreement'] >= DENSE_GRID_MIN_AGREEMENT
+        status = "✅" if served else "⚠️ not served (too coarse),"
+        print(f"{status} {model_name}: {report['points']}^{len(BASIC_FEATURES)} points, "
+              f"{report['bytes'] / 1024 / 1024:.1f} MB, built in {report['build_seconds']}s")
+        print(f"   Error vs exact on {report['samples']} slider inputs: max {report['max_abs_error']:.4f} • "
+              f"mean {report['mean_abs_error']:.4f} • p99 {report['p99_abs_error']:.4f} • "
+              f"risk level agreement {report['risk_level_agreement']:.1%} • "
+              f"{report['lookup_us_per_row']:.1f} µs per lookup")
+
+
+if __name__ == "__main__":
+    main()
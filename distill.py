@@ -0,0 +1,235 @@
+"""Distill the 7-model ensemble into a compact student model.
+
+Usage:
+    python distill.py                    # lookup-table student (default)
+    python distill.py --student tree     # shallow regression tree
+    python distill.py --student logistic
+
+The student is trained on the ensemble's soft probabilities over all 729
+input combinations plus the rows of bankruptcy_with_features.csv, and saved
+as models/student_model.pkl with models/student_metadata.pkl, which hold a
+fidelity report and a latency comparison against the ensemble.
+"""
+import argparse
+import os
+import pickle
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from artifacts import latest_models_dir, load_pickle_or_joblib
+from features import BASIC_FEATURES, DATA_FILE, create_features, grid_cell_index, grid_inputs, load_training_data
+from scoring import risk_levels
+
+STUDENT_MODEL_FILE = "student_model.pkl"
+STUDENT_METADATA_FILE = "student_metadata.pkl"
+
+
+# ========================================
+# STUDENT MODELS
+# ========================================
+# Both students take the same scaled feature matrix as the ensemble, so the
+# app can call predict / predict_proba on them without any special casing.
+# Probabilities are stored for class 1 (non-bankruptcy), like column 1 of
+# the ensemble's predict_proba.
+
+class DistilledModel:
+    """Regressor or soft-label classifier mimicking the teacher's probabilities"""
+
+    def __init__(self, estimator, kind):
+        self.estimator = estimator
+        self.kind = kind
+        self.classes_ = np.array([0, 1])
+
+    def _positive_proba(self, X):
+        if self.kind == 'logistic':
+            return self.estimator.predict_proba(X)[:, 1]
+        return np.clip(self.estimator.predict(X), 0.0, 1.0)
+
+    def predict_proba(self, X):
+        p = self._positive_proba(np.asarray(X, dtype=np.float64))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X):
+        return (self.predict_proba(X)[:, 1] > 0.5).astype(int)
+
+
+class LookupTableModel:
+    """Exact teacher probabilities for every grid cell, indexed from the scaled inputs
+
+    The table only covers the 0/0.5/1 grid. Off-grid rows are scored by the
+    teacher, which the model registry attaches after loading (it is not saved
+    in the pickle); without a teacher they raise ValueError.
+    """
+
+    def __init__(self, table, mean, scale):
+        self.table = np.asarray(table, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.classes_ = np.array([0, 1])
+        self.teacher = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['teacher'] = None
+        return state
+
+    def cell_index(self, X):
+        """(grid cell, on_grid flag) of each row; off-grid values map to the nearest cell"""
+        raw = np.asarray(X, dtype=np.float64)[:, :len(self.mean)] * self.scale + self.mean
+        return grid_cell_index(raw)
+
+    def predict_proba(self, X):
+        cells, on_grid = self.cell_index(X)
+        p = self.table[cells]
+        proba = np.column_stack([1.0 - p, p])
+        if not on_grid.all():
+            teacher = getattr(self, 'teacher', None)
+            if teacher is None:
+                raise ValueError("The lookup table only covers Low / Medium / High inputs; "
+                                 "off-grid inputs need the teacher model")
+            proba[~on_grid] = teacher.predict_proba(np.asarray(X)[~on_grid])
+        return proba
+
+    def predict(self, X):
+        return (self.predict_proba(X)[:, 1] > 0.5).astype(int)
+
+
+def fit_student(kind, X, p, scaler=None, grid_p=None):
+    """Fit a student of the given kind on scaled features X and teacher probabilities p"""
+    if kind == 'lookup':
+        # grid_inputs() enumerates cells in the same order as cell_index
+        return LookupTableModel(grid_p, scaler.mean_[:len(BASIC_FEATURES)], scaler.scale_[:len(BASIC_FEATURES)])
+    # Only the fitted students need scikit-learn; the lookup table is loaded by the numpy runtime
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeRegressor
+    if kind == 'tree':
+        estimator = DecisionTreeRegressor(max_depth=6, min_samples_leaf=3, random_state=42)
+        estimator.fit(X, p)
+        return DistilledModel(estimator, kind)
+    if kind == 'logistic':
+        # Soft labels: each row appears once per class, weighted by the teacher probability
+        X_soft = np.vstack([X, X])
+        y_soft = np.concatenate([np.ones(len(X)), np.zeros(len(X))])
+        weights = np.concatenate([p, 1.0 - p])
+        estimator = LogisticRegression(max_iter=2000)
+        estimator.fit(X_soft, y_soft, sample_weight=weights)
+        return DistilledModel(estimator, kind)
+    raise ValueError(f"Unknown student type: {kind}")
+
+
+# ========================================
+# FIDELITY AND LATENCY
+# ========================================
+
+def fidelity_report(teacher_proba, student_proba):
+    """How closely the student reproduces the teacher on the distillation set"""
+    gap = np.abs(teacher_proba[:, 1] - student_proba[:, 1])
+    return {
+        'rows': int(len(gap)),
+        'max_probability_gap': round(float(gap.max()), 6),
+        'mean_probability_gap': round(float(gap.mean()), 6),
+        'label_agreement': round(float(np.mean(teacher_proba.argmax(1) == (student_proba[:, 1] > 0.5))), 4),
+        'risk_level_agreement': round(float(np.mean(risk_levels(teacher_proba[:, 0]) == risk_levels(student_proba[:, 0]))), 4),
+    }
+
+
+def median_latency_ms(model, X, repeats=50):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(X)
+        timings.append(time.perf_counter() - start)
+    return round(float(np.median(timings)) * 1000, 4)
+
+
+def latency_report(teacher, student, X_grid):
+    single_row = X_grid[:1]
+    return {
+        'teacher_single_row_ms': median_latency_ms(teacher, single_row),
+        'student_single_row_ms': median_latency_ms(student, single_row),
+        'teacher_grid_ms': median_latency_ms(teacher, X_grid, repeats=10),
+        'student_grid_ms': median_latency_ms(student, X_grid, repeats=10),
+    }
+
+
+def performance_on_dataset(model, X, y):
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+    proba = model.predict_proba(X)[:, 1]
+    y_pred = (proba > 0.5).astype(int)
+    return {
+        'accuracy': round(accuracy_score(y, y_pred), 4),
+        'f1_score': round(f1_score(y, y_pred), 4),
+        'precision': round(precision_score(y, y_pred), 4),
+        'recall': round(recall_score(y, y_pred), 4),
+        'roc_auc': round(roc_auc_score(y, proba), 4),
+    }
+
+
+def distill(kind='lookup', models_dir=None, output_dir=None):
+    """Train a student on the ensemble and save it next to the ensemble artifacts"""
+    models_dir = models_dir or latest_models_dir()
+    output_dir = output_dir or models_dir
+    teacher = load_pickle_or_joblib(os.path.join(models_dir, "ensemble_model.pkl"))
+    scaler = load_pickle_or_joblib(os.path.join(models_dir, "feature_scaler.pkl"))
+    with open(os.path.join(models_dir, "ensemble_metadata.pkl"), 'rb') as file:
+        teacher_metadata = pickle.load(file)
+    features = teacher_metadata['features']
+
+    X_grid = scaler.transform(create_features(grid_inputs())[features])
+    X_data, y_data = load_training_data(DATA_FILE)
+    X_data = scaler.transform(X_data[features])
+    X_all = np.vstack([X_grid, X_data])
+
+    teacher_proba = teacher.predict_proba(X_all)
+    grid_p = teacher_proba[:len(X_grid), 1]
+
+    start_time = time.time()
+    student = fit_student(kind, X_all, teacher_proba[:, 1], scaler=scaler, grid_p=grid_p)
+    fit_seconds = round(time.time() - start_time, 3)
+
+    fidelity = fidelity_report(teacher_proba, student.predict_proba(X_all))
+    latency = latency_report(teacher, student, X_grid)
+
+    names = {'lookup': 'Lookup Table', 'tree': 'Shallow Tree', 'logistic': 'Logistic'}
+    student_metadata = {
+        'model_name': f"Distilled {names[kind]}",
+        'model_type': type(student).__name__,
+        'student_type': kind,
+        'teacher': teacher_metadata.get('model_name', 'Ensemble Voting Classifier'),
+        'performance': performance_on_dataset(student, X_data, y_data.values),
+        'fidelity': fidelity,
+        'latency': latency,
+        'fit_seconds': fit_seconds,
+        'features': features,
+        'training_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    joblib.dump(student, os.path.join(output_dir, STUDENT_MODEL_FILE))
+    with open(os.path.join(output_dir, STUDENT_METADATA_FILE), 'wb') as file:
+        pickle.dump(student_metadata, file)
+
+    print(f"✅ Saved {student_metadata['model_name']} to {output_dir}/")
+    print(f"   Fidelity: max gap {fidelity['max_probability_gap']:.4f}, "
+          f"label agreement {fidelity['label_agreement']:.1%}, risk level agreement {fidelity['risk_level_agreement']:.1%}")
+    print(f"   Latency (1 row): ensemble {latency['teacher_single_row_ms']} ms vs student {latency['student_single_row_ms']} ms")
+    return student_metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill the ensemble into a compact student model")
+    parser.add_argument('--student', choices=['lookup', 'tree', 'logistic'], default='lookup')
+    parser.add_argument('--models-dir', default=None, help="Teacher artifacts (default: the version the app serves)")
+    parser.add_argument('--output-dir', default=None, help="Where to save the student (default: next to the teacher)")
+    args = parser.parse_args()
+    distill(args.student, args.models_dir, args.output_dir)
+
+
+if __name__ == "__main__":
+    # Run through the importable module so pickled students reference
+    # distill.LookupTableModel rather than __main__.LookupTableModel
+    import distill as distill_module
+    distill_module.main()
@@ -0,0 +1,172 @@
+"""Constant-memory input drift monitor against the training distribution.
+
+The baseline is computed once from bankruptcy_with_features.csv: how often
+each raw factor takes each grid level, and a histogram of every engineered
+feature from create_features over fixed bins. At runtime each prediction
+only adds 1 to a few fixed-size counters (for grid inputs the bin of every
+engineered feature is looked up from a precomputed 729-row table), and the
+PSI and KL divergence against the baseline are computed on demand.
+
+Usage:
+    python drift.py                        # drift of the audit log in audit_logs/
+    python drift.py --capture requests.jsonl
+"""
+import argparse
+import threading
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from features import BASIC_FEATURES, DATA_FILE, GRID_VALUES, create_features, grid_cell_index, grid_inputs
+
+ENGINEERED_BINS = 10
+PSI_WARNING = 0.1
+PSI_ALERT = 0.25
+MIN_OBSERVATIONS = 30
+SMOOTHING = 0.5
+
+
+def _bin_edges(values, n_bins=ENGINEERED_BINS):
+    """Inner bin edges at the baseline quantiles (ties merged)"""
+    return np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+
+
+def _distribution(counts):
+    """Counts to proportions, with additive smoothing so empty bins stay finite"""
+    counts = np.asarray(counts, dtype=np.float64) + SMOOTHING
+    return counts / counts.sum()
+
+
+def psi(expected, actual):
+    """Population stability index between two count vectors"""
+    e, a = _distribution(expected), _distribution(actual)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def kl_divergence(expected, actual):
+    """KL(actual || expected) between two count vectors"""
+    e, a = _distribution(expected), _distribution(actual)
+    return float(np.sum(a * np.log(a / e)))
+
+
+class DriftBaseline:
+    """Training-data frequencies of the raw factors and binned engineered features"""
+
+    def __init__(self, data_file=DATA_FILE):
+        raw = pd.read_csv(data_file)[BASIC_FEATURES]
+        engineered = create_features(raw)
+        self.engineered_features = [name for name in engineered.columns if name not in BASIC_FEATURES]
+
+        levels = np.clip(np.rint(raw.to_numpy(dtype=np.float64) * (len(GRID_VALUES) - 1)), 0, len(GRID_VALUES) - 1)
+        self.raw_counts = np.stack([np.bincount(levels[:, j].astype(int), minlength=len(GRID_VALUES))
+                                    for j in range(len(BASIC_FEATURES))])
+        self.edges = [_bin_edges(engineered[name].to_numpy(dtype=np.float64)) for name in self.engineered_features]
+        self.engineered_counts = [np.bincount(self.bins(engineered[name].to_numpy(dtype=np.float64), i),
+                                              minlength=len(edges) + 1)
+                                  for i, (name, edges) in enumerate(zip(self.engineered_features, self.edges))]
+
+        # Bin of every engineered feature for each of the 729 grid inputs
+        grid_features = create_features(grid_inputs())
+        self.grid_bins = np.column_stack([self.bins(grid_features[name].to_numpy(dtype=np.float64), i)
+                                          for i, name in enumerate(self.engineered_features)])
+
+    def bins(self, values, feature_index):
+        return np.searchsorted(self.edges[feature_index], values, side='right')
+
+
+class DriftMonitor:
+    """Running input frequencies compared with a DriftBaseline"""
+
+    def __init__(self, baseline, psi_warning=PSI_WARNING, psi_alert=PSI_ALERT, min_observations=MIN_OBSERVATIONS):
+        self.baseline = baseline
+        self.psi_warning = psi_warning
+        self.psi_alert = psi_alert
+        self.min_observations = min_observations
+        self.raw_counts = np.zeros_like(baseline.raw_counts)
+        self.engineered_counts = [np.zeros_like(counts) for counts in baseline.engineered_counts]
+        self.observations = 0
+        self._alerting = set()
+        self._lock = threading.Lock()
+
+    def update(self, inputs):
+        """Count one prediction's raw inputs (a mapping or Series with the 6 factors)"""
+        raw = np.array([[float(inputs[factor]) for factor in BASIC_FEATURES]])
+        cells, on_grid = grid_cell_index(raw)
+        levels = np.clip(np.rint(raw[0] * (len(GRID_VALUES) - 1)), 0, len(GRID_VALUES) - 1).astype(int)
+        if on_grid[0]:
+            engineered_bins = self.baseline.grid_bins[cells[0]]
+        else:
+            features = create_features(pd.DataFrame(raw, columns=BASIC_FEATURES))
+            engineered_bins = [self.baseline.bins(features[name].to_numpy(), i)[0]
+                               for i, name in enumerate(self.baseline.engineered_features)]
+        with self._lock:
+            self.raw_counts[np.arange(len(BASIC_FEATURES)), levels] += 1
+            for counts, bin_index in zip(self.engineered_counts, engineered_bins):
+                counts[bin_index] += 1
+            self.observations += 1
+
+    def update_many(self, raw_inputs):
+        """Count every row of a DataFrame of raw inputs"""
+        for _, row in raw_inputs[BASIC_FEATURES].iterrows():
+            self.update(row)
+
+    def report(self):
+        """PSI and KL per monitored feature, worst first, with a status column"""
+        with self._lock:
+            rows = [(factor, 'raw', self.baseline.raw_counts[j], self.raw_counts[j].copy())
+                    for j, factor in enumerate(BASIC_FEATURES)]
+            rows += [(name, 'engineered', self.baseline.engineered_counts[i], self.engineered_counts[i].copy())
+                     for i, name in enumerate(self.baseline.engineered_features)]
+            observations = self.observations
+        report = pd.DataFrame([{
+            'feature': name,
+            'kind': kind,
+            'psi': psi(expected, actual),
+            'kl': kl_divergence(expected, actual),
+        } for name, kind, expected, actual in rows])
+        if observations == 0:
+            report[['psi', 'kl']] = np.nan
+        if observations < self.min_observations:
+            report['status'] = 'collecting'
+        else:
+            report['status'] = np.select([report['psi'] >= self.psi_alert, report['psi'] >= self.psi_warning],
+                                         ['alert', 'warning'], 'ok')
+        report.attrs['observations'] = observations
+        return report.sort_values('psi', ascending=False, ignore_index=True)
+
+    def alerts(self):
+        """Features whose PSI crossed the alert threshold; newly alerting ones are counted in metrics"""
+        report = self.report()
+        alerting = set(report.loc[report['status'] == 'alert', 'feature'])
+        with self._lock:
+            new_alerts = alerting - self._alerting
+            self._alerting = alerting
+        if new_alerts:
+            metrics.increment("drift.alerts", len(new_alerts))
+        return report[report['status'] == 'alert']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Input drift of logged predictions against the training data")
+    parser.add_argument('--audit', default=None, help="Audit log directory or file (default: audit_logs/)")
+    parser.add_argument('--capture', default=None, help="Captured requests.jsonl instead of the audit log")
+    args = parser.parse_args()
+
+    if args.capture:
+        from capture import read_capture
+        inputs = pd.DataFrame([record['inputs'] for record in read_capture(args.capture)], columns=BASIC_FEATURES)
+    else:
+        from audit import AUDIT_DIR, read_audit_log
+        inputs = read_audit_log(args.audit or AUDIT_DIR)[BASIC_FEATURES]
+
+    monitor = DriftMonitor(DriftBaseline())
+    monitor.update_many(inputs)
+    report = monitor.report()
+    print(f"📡 Input drift over {report.attrs['observations']} predictions "
+          f"(PSI warning {PSI_WARNING}, alert {PSI_ALERT})")
+    print(report.to_string(index=False, float_format=lambda value: f"{value:.4f}"))
+
+
+if __name__ == "__main__":
+    main()
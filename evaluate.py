@@ -0,0 +1,324 @@
+"""Evaluate every served model on a labeled dataset and refresh its metadata.
+
+Usage:
+    python evaluate.py                      # held-out split of bankruptcy_with_features.csv
+    python evaluate.py --split all          # every labeled row
+    python evaluate.py --data new_labels.csv --models-dir models/versions/v0002
+    python evaluate.py --dry-run            # print, do not write
+    python evaluate.py --data big_labels.csv --split all --recalibrate   # also reset the risk cutoffs
+
+The input features are prepared once and every model (ensemble, best single
+model, distilled student) is scored in one predict_proba call. Each model's
+probabilities are sorted once; cumulative counts over that order give the
+confusion matrix at every distinct threshold, and from there the ROC and PR
+curves and accuracy / precision / recall / F1 per threshold. The results are
+written back into the metadata files the app reads: 'performance' (shown in
+the sidebar) and 'evaluation' (curves, per-threshold table and how the
+model's current Low / Medium / High cutoffs split the data).
+
+The cutoffs themselves ('risk_thresholds') are only changed with
+--recalibrate, and only on data with at least --min-bankruptcies bankrupt
+companies: MEDIUM then starts at the highest cutoff that still flags
+--medium-recall of them as Medium or High, and HIGH at the lowest cutoff
+where at least --high-precision of the companies above it are bankrupt.
+"""
+import argparse
+import os
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, average_precision_score, f1_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from artifacts import fingerprint_files, latest_models_dir
+from features import BASIC_FEATURES, DATA_FILE, TARGET_COLUMN
+from model_registry import get_models
+from scoring import prepare_input, risk_levels, risk_thresholds
+
+# Same held-out split as train.py
+TEST_SIZE = 0.25
+RANDOM_STATE = 42
+
+METADATA_FILES = {
+    'ensemble': "ensemble_metadata.pkl",
+    'knn': "model_metadata.pkl",
+    'student': "student_metadata.pkl",
+}
+
+RISK_LEVEL_NAMES = ['LOW RISK', 'MEDIUM RISK', 'HIGH RISK']
+
+# Risk band targets (share of bankrupt companies)
+MEDIUM_RISK_RECALL = 0.95
+HIGH_RISK_PRECISION = 0.9
+# Fewer bankruptcies than this and the targets only say "catch all of them"
+MIN_RECALIBRATION_BANKRUPTCIES = 50
+
+
+# ========================================
+# SINGLE-PASS THRESHOLD METRICS
+# ========================================
+# Positive class is 1 (no bankruptcy), as in train.evaluate_performance, and
+# the score is P(class 1). Row i of the table predicts positive when
+# score >= threshold[i]; the first row (threshold +inf) predicts nothing.
+
+def _safe_divide(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+
+
+def threshold_table(y_true, scores):
+    """Confusion counts and metrics at every distinct score, from one sort"""
+    y_true = np.asarray(y_true, dtype=np.int64)
+    order = np.argsort(-scores, kind='mergesort')
+    sorted_scores = scores[order]
+    cumulative_tp = np.cumsum(y_true[order])
+
+    # Last index of each run of equal scores
+    ends = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(sorted_scores) - 1]
+    tp = np.r_[0, cumulative_tp[ends]]
+    fp = np.r_[0, ends + 1 - cumulative_tp[ends]]
+    positives, negatives = int(y_true.sum()), int(len(y_true) - y_true.sum())
+    fn, tn = positives - tp, negatives - fp
+
+    table = pd.DataFrame({'threshold': np.r_[np.inf, sorted_scores[ends]], 'tp': tp, 'fp': fp, 'tn': tn, 'fn': fn})
+    table['precision'] = _safe_divide(tp, tp + fp)
+    table['recall'] = _safe_divide(tp, np.full(len(tp), positives))
+    table['fpr'] = _safe_divide(fp, np.full(len(fp), negatives))
+    table['f1_score'] = _safe_divide(2 * tp, 2 * tp + fp + fn)
+    table['accuracy'] = (tp + tn) / len(y_true)
+    return table
+
+
+def confusion_above(y_true, scores, threshold):
+    """(tn, fp, fn, tp) when predicting positive for score > threshold (the models' own rule at 0.5)"""
+    predicted = scores > threshold
+    y_true = np.asarray(y_true, dtype=bool)
+    return (int((~predicted & ~y_true).sum()), int((predicted & ~y_true).sum()),
+            int((~predicted & y_true).sum()), int((predicted & y_true).sum()))
+
+
+def curve_metrics(table):
+    """ROC AUC (trapezoid) and average precision from a threshold table"""
+    roc_auc = float(np.trapz(table['recall'], table['fpr']))
+    recall_steps = np.diff(table['recall'].values)
+    average_precision = float(np.sum(recall_steps * table['precision'].values[1:]))
+    return roc_auc, average_precision
+
+
+def strict_cutoff(table, row):
+    """Cutoff c with (prob > c) flagging the same rows as row's (prob >= threshold) on this data"""
+    threshold = table['threshold'].iat[row]
+    lower = table['threshold'].iat[row + 1] if row + 1 < len(table) else 0.0
+    return float((threshold + lower) / 2) if threshold > 0 else 0.0
+
+
+def derive_risk_thresholds(y_true, bankruptcy_prob, medium_recall=MEDIUM_RISK_RECALL,
+                           high_precision=HIGH_RISK_PRECISION):
+    """(medium, high) cutoffs meeting the band targets, and what they achieve on this data
+
+    Falls back to the default cutoff for a band whose target no threshold meets.
+    """
+    table = threshold_table(np.asarray(y_true) == 0, np.asarray(bankruptcy_prob, dtype=np.float64))
+    medium, high = risk_thresholds(None)
+    # Rows run from the highest threshold down, so recall only grows
+    meets_recall = np.flatnonzero(table['recall'].values >= medium_recall)
+    if len(meets_recall):
+        medium = strict_cutoff(table, meets_recall[0])
+    meets_precision = np.flatnonzero((table['precision'].values >= high_precision) & (table['tp'].values > 0))
+    if len(meets_precision):
+        high = strict_cutoff(table, meets_precision[-1])
+    medium = min(medium, high)
+
+    bankrupt = np.asarray(y_true) == 0
+    above_medium, above_high = bankruptcy_prob > medium, bankruptcy_prob > high
+    achieved = {
+        'medium_recall_target': medium_recall,
+        'medium_recall': round(float(above_medium[bankrupt].mean()), 4) if bankrupt.any() else None,
+        'high_precision_target': high_precision,
+        'high_precision': round(float(bankrupt[above_high].mean()), 4) if above_high.any() else None,
+    }
+    return (round(medium, 6), round(high, 6)), achieved
+
+
+def risk_band_report(y_true, bankruptcy_prob, thresholds):
+    """Rows and actual bankruptcy rate in each risk level"""
+    levels = risk_levels(bankruptcy_prob, thresholds)
+    bankrupt = np.asarray(y_true) == 0
+    return {
+        name: {
+            'rows': int((levels == level).sum()),
+            'bankruptcy_rate': round(float(bankrupt[levels == level].mean()), 4) if (levels == level).any() else None,
+        }
+        for level, name in enumerate(RISK_LEVEL_NAMES)
+    }
+
+
+def evaluate_scores(y_true, proba, metadata, recalibrate=False, medium_recall=MEDIUM_RISK_RECALL,
+                    high_precision=HIGH_RISK_PRECISION):
+    """Performance, curves and risk-band report for one model's predict_proba output
+
+    Returns (performance, evaluation, new risk_thresholds or None without recalibrate).
+    """
+    scores = proba[:, 1]
+    table = threshold_table(y_true, scores)
+    roc_auc, average_precision = curve_metrics(table)
+    tn, fp, fn, tp = confusion_above(y_true, scores, 0.5)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    thresholds = risk_thresholds(metadata)
+    if recalibrate:
+        thresholds, achieved = derive_risk_thresholds(y_true, proba[:, 0], medium_recall, high_precision)
+    performance = {
+        'accuracy': round((tp + tn) / len(scores), 4),
+        'f1_score': round(2 * tp / (2 * tp + fp + fn), 4) if tp else 0.0,
+        'precision': round(precision, 4),
+        'recall': round(recall, 4),
+        'roc_auc': round(roc_auc, 4),
+        'pr_auc': round(average_precision, 4),
+    }
+    evaluation = {
+        'confusion_matrix': [[tn, fp], [fn, tp]],
+        'roc_curve': {'fpr': table['fpr'].tolist(), 'tpr': table['recall'].tolist(),
+                      'thresholds': table['threshold'].tolist()},
+        'pr_curve': {'precision': table['precision'].tolist(), 'recall': table['recall'].tolist(),
+                     'thresholds': table['threshold'].tolist()},
+        'threshold_metrics': table.to_dict(orient='list'),
+        'risk_bands': risk_band_report(y_true, proba[:, 0], thresholds),
+    }
+    if not recalibrate:
+        return performance, evaluation, None
+    evaluation['risk_band_targets'] = achieved
+    return performance, evaluation, {'medium': thresholds[0], 'high': thresholds[1]}
+
+
+def check_against_sklearn(y_true, proba, performance):
+    """Largest gap between the single-pass metrics and scikit-learn's"""
+    scores = proba[:, 1]
+    predicted = (scores > 0.5).astype(int)
+    reference = {
+        'accuracy': accuracy_score(y_true, predicted),
+        'f1_score': f1_score(y_true, predicted, zero_division=0),
+        'roc_auc': roc_auc_score(y_true, scores),
+        'pr_auc': average_precision_score(y_true, scores),
+    }
+    return max(abs(performance[name] - round(value, 4)) for name, value in reference.items())
+
+
+# ========================================
+# EVALUATION RUN
+# ========================================
+
+def load_labeled_data(data_file=DATA_FILE, split='test'):
+    """Raw inputs and labels; split 'test' keeps train.py's held-out rows"""
+    df = pd.read_csv(data_file)
+    if TARGET_COLUMN not in df.columns and 'class' in df.columns:
+        df[TARGET_COLUMN] = (df['class'].str.strip() == 'non-bankruptcy').astype(int)
+    raw, y = df[BASIC_FEATURES], df[TARGET_COLUMN].astype(int)
+    if split == 'test':
+        _, raw, _, y = train_test_split(raw, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y)
+    return raw.reset_index(drop=True), y.to_numpy()
+
+
+def evaluate(models_dir=None, data_file=DATA_FILE, split='test', write=True, recalibrate=False,
+             medium_recall=MEDIUM_RISK_RECALL, high_precision=HIGH_RISK_PRECISION,
+             min_bankruptcies=MIN_RECALIBRATION_BANKRUPTCIES):
+    """Evaluate every served model in models_dir and (optionally) update its metadata file"""
+    models_dir = models_dir or latest_models_dir()
+    models = get_models(models_dir)
+    if models.error:
+        raise SystemExit(f"❌ Could not load models:\n{models.error}")
+    raw, y = load_labeled_data(data_file, split)
+    bankruptcies = int((y == 0).sum())
+    if recalibrate and bankruptcies < min_bankruptcies:
+        raise SystemExit(f"❌ Only {bankruptcies} bankrupt companies in the {split} rows of {data_file}; "
+                         f"recalibrating the risk cutoffs needs at least {min_bankruptcies}")
+
+    # Prepare the features once per distinct feature list (normally one for all models)
+    prepared = {}
+    results = {}
+    for name, metadata_file in METADATA_FILES.items():
+        model, metadata = models.choice(name)
+        metadata_path = os.path.join(models_dir, metadata_file)
+        if model is None or not os.path.exists(metadata_path):
+            continue
+        features = tuple(metadata.get('features', ())) if metadata else ()
+        if features not in prepared:
+            prepared[features] = prepare_input(raw, metadata, models.scaler)
+        proba = model.predict_proba(prepared[features])
+        performance, evaluation, thresholds = evaluate_scores(y, proba, metadata, recalibrate,
+                                                              medium_recall, high_precision)
+        gap = check_against_sklearn(y, proba, performance)
+        if gap > 1e-4:
+            raise SystemExit(f"❌ {name}: single-pass metrics differ from scikit-learn by {gap:.4f}")
+        evaluation.update({
+            'evaluation_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'dataset': os.path.basename(data_file),
+            'dataset_fingerprint': fingerprint_files(data_file),
+            'split': split,
+            'rows': int(len(y)),
+        })
+        results[name] = (metadata_path, performance, evaluation, thresholds)
+
+    if write:
+        for metadata_path, performance, evaluation, thresholds in results.values():
+            # Update the file on disk (the registry's copies carry runtime-only keys such as 'fingerprint')
+            with open(metadata_path, 'rb') as file:
+                stored = pickle.load(file)
+            stored['performance'] = performance
+            stored['evaluation'] = evaluation
+            if thresholds is not None:
+                stored['risk_thresholds'] = thresholds
+            tmp_path = metadata_path + ".tmp"
+            with open(tmp_path, 'wb') as file:
+                pickle.dump(stored, file)
+            os.replace(tmp_path, metadata_path)
+    return {name: (performance, evaluation, thresholds)
+            for name, (_, performance, evaluation, thresholds) in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the served models and refresh their metadata")
+    parser.add_argument('--models-dir', default=None, help="Model artifacts (default: the version the app serves)")
+    parser.add_argument('--data', default=DATA_FILE, help="Labeled CSV with the 6 inputs and class_yn (or class)")
+    parser.add_argument('--split', choices=['test', 'all'], default='test',
+                        help="test: train.py's held-out 25%% (default); all: every row")
+    parser.add_argument('--recalibrate', action='store_true',
+                        help="Also reset each model's Low / Medium / High cutoffs from this data")
+    parser.add_argument('--min-bankruptcies', type=int, default=MIN_RECALIBRATION_BANKRUPTCIES,
+                        help="Bankrupt companies needed to recalibrate (default %(default)s)")
+    parser.add_argument('--medium-recall', type=float, default=MEDIUM_RISK_RECALL,
+                        help="With --recalibrate: share of bankrupt companies that must be Medium or High risk "
+                             "(default %(default)s)")
+    parser.add_argument('--high-precision', type=float, default=HIGH_RISK_PRECISION,
+                        help="With --recalibrate: share of High risk companies that must be bankrupt (default %(default)s)")
+    parser.add_argument('--dry-run', action='store_true', help="Print the results without writing metadata")
+    args = parser.parse_args()
+
+    results = evaluate(args.models_dir, args.data, args.split, write=not args.dry_run, recalibrate=args.recalibrate,
+                       medium_recall=args.medium_recall, high_precision=args.high_precision,
+                       min_bankruptcies=args.min_bankruptcies)
+    for name, (performance, evaluation, thresholds) in results.items():
+        (tn, fp), (fn, tp) = evaluation['confusion_matrix']
+        print(f"📊 {name}: " + " • ".join(f"{metric} {value:.4f}" for metric, value in performance.items()))
+        print(f"   Confusion matrix at 0.5: TN {tn} FP {fp} FN {fn} TP {tp} "
+              f"({evaluation['rows']} rows, {len(evaluation['threshold_metrics']['threshold'])} thresholds)")
+        bands = " • ".join(f"{level} {band['rows']} rows"
+                           + (f" ({band['bankruptcy_rate']:.0%} bankrupt)" if band['rows'] else "")
+                           for level, band in evaluation['risk_bands'].items())
+        print(f"   {bands}")
+        if thresholds is None:
+            continue
+        targets = evaluation['risk_band_targets']
+        print(f"   Cutoffs: Medium above {thresholds['medium']:.1%} (catches {targets['medium_recall']:.0%} of bankruptcies) • "
+              f"High above {thresholds['high']:.1%} ("
+              + (f"{targets['high_precision']:.0%} bankrupt)" if targets['high_precision'] is not None else "no rows)"))
+        for band in ('medium_recall', 'high_precision'):
+            if targets[band] is None or targets[band] < targets[f"{band}_target"]:
+                print(f"   ⚠️ No cutoff reaches {band.replace('_', ' ')} {targets[f'{band}_target']:.0%} - kept the default")
+    if not args.dry_run:
+        print("✅ Updated metadata files")
+
+
+if __name__ == "__main__":
+    main()
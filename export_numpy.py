@@ -0,0 +1,222 @@
+"""Export the fitted ensemble to plain NumPy arrays for numpy_runtime.py.
+
+Usage:
+    python export_numpy.py                 # writes ensemble_numpy.npz next to the ensemble
+    python export_numpy.py --models-dir models/versions/v0002
+
+After exporting, the evaluator is checked against the original
+predict_proba over all 729 grid inputs and the labeled dataset. The export
+records a hash of the ensemble and scaler files it came from; the model
+registry refuses to serve it once those files change.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from artifacts import fingerprint_files, latest_models_dir, load_pickle_or_joblib
+from features import create_features, grid_inputs, load_training_data
+from numpy_runtime import NUMPY_ENSEMBLE_FILE, NumpyEnsemble
+
+EXPORT_TOLERANCE = 1e-6
+
+
+# ========================================
+# TREE FLATTENING
+# ========================================
+# All tree ensembles are flattened into one set of node arrays where a row
+# goes left when x <= threshold. XGBoost splits on x < threshold in float32,
+# which is the same as x <= the next float32 below the threshold.
+
+def _pack_trees(trees):
+    """Concatenate per-tree node arrays, offsetting child indices"""
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        n_nodes = len(tree['feature'])
+        is_leaf = tree['feature'] < 0
+        roots.append(offset)
+        feature.append(tree['feature'])
+        threshold.append(tree['threshold'])
+        left.append(np.where(is_leaf, -1, tree['left'] + offset))
+        right.append(np.where(is_leaf, -1, tree['right'] + offset))
+        value.append(tree['value'])
+        offset += n_nodes
+    return {
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'value': np.concatenate(value).astype(np.float64),
+        'roots': np.array(roots, dtype=np.int32),
+    }
+
+
+def _sklearn_tree(estimator):
+    tree = estimator.tree_
+    counts = tree.value[:, 0, :]
+    return {
+        'feature': tree.feature,
+        'threshold': tree.threshold,
+        'left': tree.children_left,
+        'right': tree.children_right,
+        'value': counts[:, 1] / counts.sum(axis=1),
+    }
+
+
+def _xgboost_trees(model):
+    booster = model.get_booster()
+    raw = json.loads(booster.save_raw('json'))
+    trees = []
+    for tree in raw['learner']['gradient_booster']['model']['trees']:
+        left = np.array(tree['left_children'])
+        conditions = np.array(tree['split_conditions'], dtype=np.float32)
+        is_leaf = left == -1
+        trees.append({
+            'feature': np.where(is_leaf, -1, np.array(tree['split_indices'])),
+            'threshold': np.where(is_leaf, 0.0, np.nextafter(conditions, np.float32(-np.inf)).astype(np.float64)),
+            'left': left,
+            'right': np.array(tree['right_children']),
+            'value': np.where(is_leaf, conditions.astype(np.float64), 0.0),
+        })
+    base_score = float(json.loads(booster.save_config())['learner']['learner_model_param']['base_score'])
+    return trees, float(np.log(base_score / (1.0 - base_score)))
+
+
+def _lightgbm_trees(model):
+    dump = model.booster_.dump_model()
+    trees = []
+    for info in dump['tree_info']:
+        feature, threshold, left, right, value = [], [], [], [], []
+
+        def visit(node):
+            index = len(feature)
+            feature.append(-1)
+            threshold.append(0.0)
+            left.append(-1)
+            right.append(-1)
+            value.append(0.0)
+            if 'leaf_value' in node:
+                value[index] = node['leaf_value']
+                return index
+            if node['decision_type'] != '<=':
+                raise ValueError(f"Unsupported LightGBM split: {node['decision_type']}")
+            feature[index] = node['split_feature']
+            threshold[index] = node['threshold']
+            left[index] = visit(node['left_child'])
+            right[index] = visit(node['right_child'])
+            return index
+
+        visit(info['tree_structure'])
+        trees.append({key: np.array(values) for key, values in
+                      zip(['feature', 'threshold', 'left', 'right', 'value'], [feature, threshold, left, right, value])})
+    sigmoid = float(dump['objective'].split('sigmoid:')[1]) if 'sigmoid:' in dump['objective'] else 1.0
+    return trees, sigmoid
+
+
+# ========================================
+# MEMBER EXPORT
+# ========================================
+
+def export_member(name, estimator):
+    """Return (spec, arrays) for one fitted ensemble member"""
+    kind = type(estimator).__name__
+    if kind == 'LogisticRegression':
+        return {'name': name, 'kind': 'logistic'}, {
+            'coef': estimator.coef_[0].astype(np.float64),
+            'intercept': estimator.intercept_.astype(np.float64),
+        }
+    if kind == 'KNeighborsClassifier':
+        if estimator.weights != 'uniform' or estimator.effective_metric_ != 'euclidean':
+            raise ValueError("Only uniform-weight euclidean KNN can be exported")
+        return {'name': name, 'kind': 'knn', 'n_neighbors': int(estimator.n_neighbors)}, {
+            'fit_X': estimator._fit_X.astype(np.float64),
+            'y': estimator._y.astype(np.int64),
+        }
+    if kind == 'SVC':
+        if estimator.kernel != 'rbf' or not estimator.probability:
+            raise ValueError("Only RBF SVC with probability=True can be exported")
+        return {'name': name, 'kind': 'svm', 'gamma': float(estimator._gamma)}, {
+            'support_vectors': estimator.support_vectors_.astype(np.float64),
+            'dual_coef': estimator._dual_coef_[0].astype(np.float64),
+            'intercept': estimator._intercept_.astype(np.float64),
+            'prob_a': estimator.probA_.astype(np.float64),
+            'prob_b': estimator.probB_.astype(np.float64),
+        }
+    if kind == 'DecisionTreeClassifier':
+        return {'name': name, 'kind': 'trees', 'input_dtype': 'float32', 'output': 'mean_proba'}, \
+            _pack_trees([_sklearn_tree(estimator)])
+    if kind == 'RandomForestClassifier':
+        return {'name': name, 'kind': 'trees', 'input_dtype': 'float32', 'output': 'mean_proba'}, \
+            _pack_trees([_sklearn_tree(tree) for tree in estimator.estimators_])
+    if kind == 'XGBClassifier':
+        trees, base_margin = _xgboost_trees(estimator)
+        return {'name': name, 'kind': 'trees', 'input_dtype': 'float32', 'output': 'xgboost',
+                'base_margin': base_margin}, _pack_trees(trees)
+    if kind == 'LGBMClassifier':
+        trees, sigmoid = _lightgbm_trees(estimator)
+        return {'name': name, 'kind': 'trees', 'input_dtype': 'float64', 'output': 'lightgbm',
+                'sigmoid': sigmoid}, _pack_trees(trees)
+    raise ValueError(f"Cannot export ensemble member {name} of type {kind}")
+
+
+def export_ensemble(ensemble_model, scaler, path, source_fingerprint=None):
+    """Write the ensemble and scaler as arrays to a .npz file
+
+    source_fingerprint identifies the pickles exported (see export_fingerprint).
+    """
+    if ensemble_model.voting != 'soft':
+        raise ValueError("Only soft-voting ensembles can be exported")
+    spec = {
+        'classes': [int(c) for c in ensemble_model.le_.inverse_transform(np.arange(2))],
+        'weights': ensemble_model.weights,
+        'members': [],
+        'source_fingerprint': source_fingerprint,
+    }
+    payload = {}
+    for name, estimator in ensemble_model.named_estimators_.items():
+        member_spec, arrays = export_member(name, estimator)
+        spec['members'].append(member_spec)
+        for key, array in arrays.items():
+            payload[f"{name}__{key}"] = array
+    payload['scaler__mean'] = scaler.mean_.astype(np.float64)
+    payload['scaler__scale'] = scaler.scale_.astype(np.float64)
+    payload['__spec__'] = np.array(json.dumps(spec))
+    np.savez_compressed(path, **payload)
+
+
+def export_fingerprint(models_dir):
+    """Hash of the ensemble and scaler files an export of models_dir is made from"""
+    return fingerprint_files(os.path.join(models_dir, "ensemble_model.pkl"),
+                             os.path.join(models_dir, "feature_scaler.pkl"))
+
+
+def verify_export(ensemble_model, numpy_ensemble, X):
+    """Largest absolute probability difference between the original and the export"""
+    return float(np.abs(ensemble_model.predict_proba(X) - numpy_ensemble.predict_proba(X)).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the ensemble for the pure-NumPy runtime")
+    parser.add_argument('--models-dir', default=None, help="Ensemble artifacts (default: the version the app serves)")
+    args = parser.parse_args()
+
+    models_dir = args.models_dir or latest_models_dir()
+    ensemble_model = load_pickle_or_joblib(os.path.join(models_dir, "ensemble_model.pkl"))
+    scaler = load_pickle_or_joblib(os.path.join(models_dir, "feature_scaler.pkl"))
+    path = os.path.join(models_dir, NUMPY_ENSEMBLE_FILE)
+    export_ensemble(ensemble_model, scaler, path, export_fingerprint(models_dir))
+
+    features = list(scaler.feature_names_in_)
+    X_data, _ = load_training_data()
+    X = scaler.transform(np.vstack([create_features(grid_inputs())[features].values, X_data[features].values]))
+    max_gap = verify_export(ensemble_model, NumpyEnsemble.load(path), X)
+    if max_gap > EXPORT_TOLERANCE:
+        os.remove(path)
+        raise SystemExit(f"❌ Export differs from the ensemble by {max_gap:.2e} (tolerance {EXPORT_TOLERANCE:.0e})")
+    print(f"✅ Saved {path} ({os.path.getsize(path) / 1024:.0f} KB, max probability gap {max_gap:.2e})")
+
+
+if __name__ == "__main__":
+    main()
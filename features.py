@@ -0,0 +1,87 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# ========================================
+# SHARED FEATURE ENGINEERING
+# ========================================
+# Used by the Streamlit app (prediction.py) and by the offline tools
+# (training, evaluation) so every path builds exactly the same 17 features.
+
+# The 6 raw inputs, in the order the app and the model metadata use them
+BASIC_FEATURES = [
+    'industrial_risk',
+    'management_risk',
+    'financial_flexibility',
+    'credibility',
+    'competitiveness',
+    'operating_risk',
+]
+
+# Each raw input is rated on this discrete scale in the app
+GRID_VALUES = (0.0, 0.5, 1.0)
+
+DATA_FILE = "bankruptcy_with_features.csv"
+TARGET_COLUMN = 'class_yn'
+
+
+def create_features(df):
+    """Create engineered features from basic features"""
+    df_featured = df.copy()
+    
+    risk_cols = ['industrial_risk', 'management_risk', 'operating_risk']
+    financial_cols = ['financial_flexibility', 'credibility', 'competitiveness']
+    
+    df_featured['financial_health_score'] = df_featured[financial_cols].mean(axis=1)
+    df_featured['management_impact_score'] = df_featured['management_risk'] / (df_featured['financial_flexibility'] + df_featured['credibility'] + 1)
+    df_featured['risk_stability_ratio'] = (df_featured['financial_flexibility'] + df_featured['credibility']) / (df_featured['management_risk'] + 1)
+    
+    df_featured['risk_volatility'] = df_featured[risk_cols].std(axis=1)
+    weights = {'financial_flexibility': 0.4, 'credibility': 0.3, 'competitiveness': 0.3}
+    df_featured['financial_stability'] = sum(df_featured[col] * w for col, w in weights.items())
+    df_featured['risk_financial_ratio'] = df_featured[risk_cols].mean(axis=1) / (df_featured[financial_cols].mean(axis=1) + 1)
+    
+    df_featured['management_financial_risk'] = df_featured['management_risk'] / (df_featured['financial_flexibility'] + 0.1)
+    df_featured['operational_sustainability'] = ((df_featured['financial_flexibility'] + df_featured['competitiveness']) / 2) * (1 - df_featured['operating_risk'])
+    risk_threshold = 0.7
+    df_featured['compound_risk'] = (df_featured[risk_cols] > risk_threshold).sum(axis=1) / len(risk_cols)
+    
+    df_featured['financial_x_management'] = df_featured['financial_health_score'] * df_featured['management_risk']
+    df_featured['risk_x_operational'] = df_featured['risk_volatility'] * df_featured['operating_risk']
+    
+    return df_featured
+
+
+def engineered_feature_names():
+    """Names of all features produced by create_features, in column order"""
+    sample = pd.DataFrame([[0.5] * len(BASIC_FEATURES)], columns=BASIC_FEATURES)
+    return list(create_features(sample).columns)
+
+
+def grid_inputs():
+    """All 729 combinations of the 6 raw inputs on the 0/0.5/1 grid"""
+    combos = list(itertools.product(GRID_VALUES, repeat=len(BASIC_FEATURES)))
+    return pd.DataFrame(combos, columns=BASIC_FEATURES)
+
+
+def grid_cell_index(raw):
+    """Position in grid_inputs() of each row of raw inputs (off-grid values snap to the nearest level)
+
+    Returns (cell index, on_grid flag) arrays.
+    """
+    raw = np.asarray(raw, dtype=np.float64)
+    n_levels = len(GRID_VALUES)
+    scaled = raw * (n_levels - 1)
+    levels = np.clip(np.rint(scaled), 0, n_levels - 1)
+    on_grid = np.all(np.abs(scaled - levels) < 1e-9, axis=1)
+    powers = n_levels ** np.arange(raw.shape[1] - 1, -1, -1)
+    return levels.astype(np.int64) @ powers, on_grid
+
+
+def load_training_data(path=DATA_FILE):
+    """Load the labeled dataset and return (engineered features, target)"""
+    df = pd.read_csv(path)
+    X = create_features(df[BASIC_FEATURES])
+    y = df[TARGET_COLUMN].astype(int)
+    return X, y
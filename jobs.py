@@ -0,0 +1,333 @@
+"""Background batch scoring jobs with checkpointed, resumable output.
+
+Usage:
+    python jobs.py submit companies.csv --model knn   # queue a file, prints the job ID
+    python jobs.py work                               # process every unfinished job, then exit
+    python jobs.py status                             # all jobs
+    python jobs.py status 20261019-142301-a1b2c3      # one job (the JSON the app polls)
+    python jobs.py cancel 20261019-142301-a1b2c3
+
+Submitting copies the CSV (the 6 risk factors, any other columns are kept)
+into jobs/<job id>/ and returns at once; a small worker pool scores it in
+chunks of CHUNK_ROWS rows. After each chunk the results are appended to
+output.csv and job.json is rewritten (atomically) with the rows done and the
+size of output.csv, so the file can be downloaded while it grows and progress
+can be polled from job.json. If the process dies, the next worker to pick the
+job up cuts output.csv back to the last recorded size and carries on from the
+next chunk. A job keeps the model version it was submitted with: the model
+files are hashed again before every chunk, and if they changed since the
+job's first chunk it fails instead of mixing results from two models. The
+job's lock file is removed once it is finished.
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from artifacts import fingerprint_files
+from features import BASIC_FEATURES
+from model_registry import MODEL_CHOICES, get_models, route
+from scoring import grid_probabilities, risk_levels, risk_thresholds
+from stress import score_inputs
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, one server process per jobs/ folder
+    fcntl = None
+
+JOBS_DIR = "jobs"
+JOB_WORKERS = 2
+CHUNK_ROWS = 5000
+RISK_LEVEL_NAMES = ['LOW RISK', 'MEDIUM RISK', 'HIGH RISK']
+UNFINISHED = ('queued', 'running')
+
+
+def new_job_id():
+    """Sortable, unique job ID: creation time plus a random suffix"""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def _write_json(path, state):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(state, file, indent=2)
+    os.replace(tmp_path, path)
+
+
+def score_chunk(chunk, model, metadata, scaler, surface):
+    """The chunk with bankruptcy_prob, prediction (0 = bankruptcy) and risk_level columns added"""
+    raw = chunk[BASIC_FEATURES].to_numpy(dtype=np.float64)
+    if np.isnan(raw).any() or (raw < 0).any() or (raw > 1).any():
+        bad = chunk.index[np.isnan(raw).any(axis=1) | (raw < 0).any(axis=1) | (raw > 1).any(axis=1)]
+        raise ValueError(f"Risk factors must be between 0 and 1 (data row {bad[0] + 1})")
+    bankruptcy_prob, _ = score_inputs(raw, model, metadata, scaler, surface)
+    scored = chunk.copy()
+    scored['bankruptcy_prob'] = bankruptcy_prob
+    scored['prediction'] = np.where(bankruptcy_prob >= 0.5, 0, 1)
+    scored['risk_level'] = np.array(RISK_LEVEL_NAMES)[risk_levels(bankruptcy_prob, risk_thresholds(metadata))]
+    return scored
+
+
+class JobQueue:
+    """Job folders under directory, processed by a thread pool"""
+
+    def __init__(self, directory=JOBS_DIR, workers=JOB_WORKERS, runtime="sklearn", resume=True):
+        self.directory = directory
+        self.runtime = runtime
+        self._surfaces = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        if resume:
+            # Jobs left queued or half done by an earlier process
+            for job in self.list_jobs():
+                if job['status'] in UNFINISHED:
+                    self._executor.submit(self.run_job, job['job_id'])
+
+    def _path(self, job_id, name):
+        return os.path.join(self.directory, job_id, name)
+
+    def submit(self, source, model='ensemble', models_dir=None, chunk_rows=CHUNK_ROWS, name=None, start=True):
+        """Queue a CSV path or file object for scoring; returns the job ID
+
+        With start=False the job is only written to disk, for a later worker.
+        """
+        if model not in MODEL_CHOICES:
+            raise ValueError(f"Unknown model {model!r}")
+        job_id = new_job_id()
+        os.makedirs(os.path.join(self.directory, job_id))
+        input_file = self._path(job_id, "input.csv")
+        try:
+            if isinstance(source, (str, os.PathLike)):
+                shutil.copyfile(source, input_file)
+            else:
+                with open(input_file, 'wb') as file:
+                    shutil.copyfileobj(source, file)
+            columns = pd.read_csv(input_file, nrows=0).columns
+            missing = [factor for factor in BASIC_FEATURES if factor not in columns]
+            if missing:
+                raise ValueError(f"File is missing columns: {', '.join(missing)}")
+            total_rows = sum(len(part) for part in pd.read_csv(input_file, usecols=BASIC_FEATURES[:1],
+                                                               chunksize=100000))
+        except Exception:
+            shutil.rmtree(os.path.join(self.directory, job_id), ignore_errors=True)
+            raise
+        models_dir = models_dir or route()
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        _write_json(self._path(job_id, "job.json"), {
+            'job_id': job_id,
+            'name': name or os.path.basename(str(source if isinstance(source, (str, os.PathLike))
+                                                 else getattr(source, 'name', job_id))),
+            'status': 'queued',
+            'model': model,
+            'models_dir': models_dir,
+            'fingerprint': None,
+            'chunk_rows': chunk_rows,
+            'total_rows': total_rows,
+            'rows_done': 0,
+            'chunks_done': 0,
+            'output_bytes': 0,
+            'created': now,
+            'updated': now,
+            'seconds': 0.0,
+            'error': None,
+        })
+        metrics.increment("jobs.submitted")
+        if start:
+            self._executor.submit(self.run_job, job_id)
+        return job_id
+
+    def status(self, job_id):
+        """The job's state from job.json (None for an unknown job)"""
+        try:
+            with open(self._path(job_id, "job.json")) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def list_jobs(self):
+        """State of every job, newest first"""
+        job_ids = sorted((entry for entry in os.listdir(self.directory)
+                          if os.path.isdir(os.path.join(self.directory, entry))), reverse=True)
+        return [state for state in map(self.status, job_ids) if state is not None]
+
+    def output_path(self, job_id):
+        return self._path(job_id, "output.csv")
+
+    def cancel(self, job_id):
+        """Ask the worker to stop after the current chunk (the output so far is kept)"""
+        open(self._path(job_id, "cancel"), 'w').close()
+
+    def _surface(self, models_dir, model_name, model, metadata, scaler):
+        # Low / Medium / High inputs are looked up instead of scored; one surface per model file set
+        key = (models_dir, model_name, metadata.get('fingerprint') if metadata else None)
+        with self._lock:
+            if key not in self._surfaces:
+                self._surfaces[key] = grid_probabilities(model, metadata, scaler)
+            return self._surfaces[key]
+
+    def _remove_lock(self, job_id):
+        # Called with the lock held on a finished job: a worker that opens the file later sees the final state
+        try:
+            os.remove(self._path(job_id, "lock"))
+        except FileNotFoundError:
+            pass  # removed by a worker that held it just before us
+
+    def run_job(self, job_id):
+        """Process one job from its last finished chunk; returns its final state"""
+        lock_file = open(self._path(job_id, "lock"), 'w')
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return self.status(job_id)  # another process is running it
+            state = self.status(job_id)
+            if state is None or state['status'] not in UNFINISHED:
+                self._remove_lock(job_id)
+                return state
+            try:
+                self._run(state)
+            except Exception as error:
+                state.update(status='failed', error=f"{type(error).__name__}: {error}")
+                metrics.increment("jobs.failed")
+            state['updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            _write_json(self._path(job_id, "job.json"), state)
+            if state['status'] not in UNFINISHED:
+                self._remove_lock(job_id)
+            return state
+        finally:
+            lock_file.close()
+
+    def _run(self, state):
+        job_id = state['job_id']
+        models = get_models(state['models_dir'], self.runtime)
+        if models.error:
+            raise RuntimeError(f"Could not load models from {state['models_dir']}")
+        model, metadata = models.choice(state['model'])
+        if model is None:
+            raise RuntimeError(f"No {state['model']} model in {state['models_dir']}")
+        fingerprint = metadata.get('fingerprint') if metadata else None
+        if state['fingerprint'] not in (None, fingerprint):
+            raise RuntimeError("Model files changed since the job started; submit it again")
+        surface = self._surface(state['models_dir'], state['model'], model, metadata, models.scaler)
+        state.update(status='running', fingerprint=fingerprint)
+        _write_json(self._path(job_id, "job.json"), state)
+
+        output_file = self.output_path(job_id)
+        with open(output_file, 'ab') as output:
+            # Drop whatever a crashed run wrote after the last checkpoint
+            output.truncate(state['output_bytes'])
+            reader = pd.read_csv(self._path(job_id, "input.csv"), chunksize=state['chunk_rows'])
+            for number, chunk in enumerate(reader):
+                if number < state['chunks_done']:
+                    continue
+                if os.path.exists(self._path(job_id, "cancel")):
+                    state['status'] = 'cancelled'
+                    return
+                if metadata and fingerprint_files(*metadata['fingerprint_files']) != fingerprint:
+                    raise RuntimeError("Model files changed while the job was running; submit it again")
+                start = time.perf_counter()
+                scored = score_chunk(chunk, model, metadata, models.scaler, surface)
+                output.write(scored.to_csv(index=False, header=number == 0).encode('utf-8'))
+                output.flush()
+                os.fsync(output.fileno())
+                state.update(rows_done=state['rows_done'] + len(chunk), chunks_done=number + 1,
+                             output_bytes=output.tell(), seconds=state['seconds'] + time.perf_counter() - start,
+                             updated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+                _write_json(self._path(job_id, "job.json"), state)
+                metrics.increment("jobs.chunks")
+                metrics.increment("jobs.rows", len(chunk))
+        state['status'] = 'done'
+        metrics.increment("jobs.completed")
+
+    def close(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+def job_progress(state):
+    """Fraction of rows done (1.0 for an empty file)"""
+    return state['rows_done'] / state['total_rows'] if state['total_rows'] else 1.0
+
+
+def jobs_table(states):
+    """Job states as a display DataFrame"""
+    return pd.DataFrame([{
+        'job_id': state['job_id'],
+        'name': state['name'],
+        'model': state['model'],
+        'status': state['status'],
+        'progress': f"{job_progress(state):.0%}",
+        'rows': f"{state['rows_done']}/{state['total_rows']}",
+        'rows_per_second': round(state['rows_done'] / state['seconds']) if state['seconds'] else None,
+        'updated': state['updated'],
+        'error': state['error'] or '',
+    } for state in states], columns=['job_id', 'name', 'model', 'status', 'progress', 'rows', 'rows_per_second',
+                                     'updated', 'error'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue, run and inspect batch scoring jobs")
+    parser.add_argument('--jobs-dir', default=JOBS_DIR)
+    parser.add_argument('--runtime', choices=['sklearn', 'numpy'], default='sklearn')
+    commands = parser.add_subparsers(dest='command', required=True)
+    submit = commands.add_parser('submit', help="Queue a CSV for scoring")
+    submit.add_argument('input_file')
+    submit.add_argument('--model', choices=list(MODEL_CHOICES), default='ensemble')
+    submit.add_argument('--models-dir', default=None, help="Model artifacts (default: the version the app serves)")
+    submit.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    submit.add_argument('--run', action='store_true', help="Process it now instead of leaving it for a worker")
+    work = commands.add_parser('work', help="Process every queued or interrupted job, then exit")
+    work.add_argument('--workers', type=int, default=JOB_WORKERS)
+    status = commands.add_parser('status', help="Show all jobs, or one job as JSON")
+    status.add_argument('job_id', nargs='?')
+    cancel = commands.add_parser('cancel', help="Stop a job after its current chunk")
+    cancel.add_argument('job_id')
+    args = parser.parse_args()
+
+    if args.command == 'submit':
+        queue = JobQueue(args.jobs_dir, workers=1, runtime=args.runtime, resume=False)
+        try:
+            job_id = queue.submit(args.input_file, args.model, args.models_dir, args.chunk_rows, start=args.run)
+        except (ValueError, KeyError) as error:
+            raise SystemExit(f"❌ {error}")
+        print(f"📦 Queued job {job_id}" + ("" if args.run else " - run python jobs.py work, or open the app"))
+        queue.close()
+        if args.run:
+            state = queue.status(job_id)
+            print(f"{'✅' if state['status'] == 'done' else '❌'} {state['status']}: {state['rows_done']} rows "
+                  f"in {state['seconds']:.1f}s → {queue.output_path(job_id)}")
+            if state['error']:
+                print(f"   {state['error']}")
+    elif args.command == 'work':
+        queue = JobQueue(args.jobs_dir, workers=args.workers, runtime=args.runtime)
+        queue.close()
+        print(jobs_table(queue.list_jobs()).to_string(index=False))
+    elif args.command == 'status':
+        queue = JobQueue(args.jobs_dir, resume=False)
+        if args.job_id:
+            state = queue.status(args.job_id)
+            if state is None:
+                raise SystemExit(f"❌ No job {args.job_id}")
+            print(json.dumps(state, indent=2))
+        else:
+            print(jobs_table(queue.list_jobs()).to_string(index=False))
+    else:
+        queue = JobQueue(args.jobs_dir, resume=False)
+        if queue.status(args.job_id) is None:
+            raise SystemExit(f"❌ No job {args.job_id}")
+        queue.cancel(args.job_id)
+        print(f"🛑 {args.job_id} will stop after its current chunk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Precomputed-grid KNN index for the best single model and the ensemble's KNN member.
+
+Usage:
+    python knn_index.py                  # writes knn_index.pkl next to the models
+    python knn_index.py --models-dir models/versions/v0002
+
+The KNN result of every one of the 729 grid inputs is computed once with the
+original model and stored; those inputs are answered by a table lookup.
+Off-grid inputs are passed to the original fitted KNN in one batch, so every
+result is exactly the original model's. The index records a hash of the
+files it was built from, and the model registry ignores it once they change.
+"""
+import argparse
+import os
+import pickle
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from artifacts import fingerprint_files, latest_models_dir, load_pickle_or_joblib
+from features import BASIC_FEATURES, grid_cell_index, grid_inputs, load_training_data
+from scoring import prepare_input
+
+KNN_INDEX_FILE = "knn_index.pkl"
+
+
+class GridKNN:
+    """Drop-in replacement for a fitted KNeighborsClassifier with the grid answers precomputed"""
+
+    def __init__(self, knn, scaler, grid_X):
+        self.knn = knn
+        self.classes_ = knn.classes_
+        self.mean = scaler.mean_[:len(BASIC_FEATURES)]
+        self.scale = scaler.scale_[:len(BASIC_FEATURES)]
+        # Exact results for every grid cell, straight from the original model
+        self.grid_proba = knn.predict_proba(grid_X)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        cells, on_grid = grid_cell_index(X[:, :len(self.mean)] * self.scale + self.mean)
+        proba = np.empty((len(X), len(self.classes_)))
+        proba[on_grid] = self.grid_proba[cells[on_grid]]
+        if not on_grid.all():
+            proba[~on_grid] = self.knn.predict_proba(X[~on_grid])
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def knn_index_fingerprint(models_dir):
+    """Hash of the model and scaler files an index of models_dir is built from"""
+    return fingerprint_files(*(os.path.join(models_dir, name) for name in
+                               ("best_model_knn.pkl", "ensemble_model.pkl", "feature_scaler.pkl")))
+
+
+def build_knn_index(models_dir):
+    """Grid indexes for best_model_knn.pkl and the ensemble's KNN member
+
+    Returns {name: (original KNN, GridKNN)}.
+    """
+    scaler = load_pickle_or_joblib(os.path.join(models_dir, "feature_scaler.pkl"))
+    with open(os.path.join(models_dir, "model_metadata.pkl"), 'rb') as file:
+        metadata = pickle.load(file)
+    grid_X = prepare_input(grid_inputs(), metadata, scaler)
+
+    originals = {}
+    best_model_file = os.path.join(models_dir, "best_model_knn.pkl")
+    if os.path.exists(best_model_file):
+        originals['best_model'] = load_pickle_or_joblib(best_model_file)
+    ensemble_model = load_pickle_or_joblib(os.path.join(models_dir, "ensemble_model.pkl"))
+    if 'knn' in getattr(ensemble_model, 'named_estimators_', {}):
+        originals['ensemble_knn'] = ensemble_model.named_estimators_['knn']
+
+    return {name: (knn, GridKNN(knn, scaler, grid_X)) for name, knn in originals.items()}
+
+
+def verify_index(knn, index, X):
+    """Rows where the index differs from the original KNN"""
+    return int((knn.predict_proba(X) != index.predict_proba(X)).any(axis=1).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed-grid KNN index")
+    parser.add_argument('--models-dir', default=None, help="Model artifacts (default: the version the app serves)")
+    args = parser.parse_args()
+
+    models_dir = args.models_dir or latest_models_dir()
+    indexes = build_knn_index(models_dir)
+
+    # Check on the grid, the dataset and random off-grid inputs
+    scaler = load_pickle_or_joblib(os.path.join(models_dir, "feature_scaler.pkl"))
+    with open(os.path.join(models_dir, "model_metadata.pkl"), 'rb') as file:
+        metadata = pickle.load(file)
+    X_data, _ = load_training_data()
+    off_grid = pd.DataFrame(np.random.RandomState(42).rand(500, len(BASIC_FEATURES)), columns=BASIC_FEATURES)
+    X_check = np.vstack([
+        prepare_input(grid_inputs(), metadata, scaler),
+        prepare_input(X_data[BASIC_FEATURES], metadata, scaler),
+        prepare_input(off_grid, metadata, scaler),
+    ])
+
+    saved = {'fingerprint': knn_index_fingerprint(models_dir)}
+    for name, (knn, index) in indexes.items():
+        mismatches = verify_index(knn, index, X_check)
+        if mismatches:
+            raise SystemExit(f"❌ {name} index differs from the original KNN on {mismatches} rows")
+        saved[name] = index
+
+    path = os.path.join(models_dir, KNN_INDEX_FILE)
+    joblib.dump(saved, path)
+    print(f"✅ Saved {path} ({', '.join(name for name in saved if name != 'fingerprint')})")
+
+
+if __name__ == "__main__":
+    # Run through the importable module so the pickle references knn_index.GridKNN
+    import knn_index as knn_index_module
+    knn_index_module.main()
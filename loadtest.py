@@ -0,0 +1,208 @@
+"""Offline load test of the app's scoring path.
+
+Usage:
+    python loadtest.py                                   # 8 sessions, 20 s, ensemble
+    python loadtest.py --sessions 32 --think-time 1.0 --duration 60
+    python loadtest.py --model knn --csv-share 1.0 --scenario predict
+    python loadtest.py --cache /tmp/loadtest_cache.sqlite --json report.json
+
+Streamlit runs every browser session as a thread in one server process, so
+each simulated analyst is a thread that repeatedly picks an input, runs what
+the "Analyze" button runs (prediction and one-factor sensitivity, plus the
+Shapley attributions and the path to Low Risk with --scenario full) and then
+waits an exponentially distributed think time. All sessions share the models
+from model_registry, as the app does. Inputs are drawn from the 729 grid
+combinations and the rows of bankruptcy_with_features.csv. The app has no
+HTTP API, so only the in-process scoring path is driven. Nothing touches the
+network.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from features import BASIC_FEATURES, DATA_FILE, grid_inputs
+from memory_report import process_rss_bytes
+from model_registry import MODEL_CHOICES, get_models
+from prediction_cache import PredictionCache
+from scoring import (DEFAULT_EFFORT_WEIGHTS, counterfactual_search, grid_probabilities, risk_thresholds,
+                     sensitivity_analysis, shapley_values, wants_counterfactual)
+
+
+def input_pool(csv_share, data_file=DATA_FILE):
+    """Grid inputs and dataset rows, with the share of each to draw from"""
+    grid = grid_inputs()
+    dataset = pd.read_csv(data_file)[BASIC_FEATURES].reset_index(drop=True) if csv_share > 0 else grid.iloc[:0]
+    return grid, dataset
+
+
+class ScoringPath:
+    """What one click on the Analyze button computes, for one model"""
+
+    def __init__(self, model_name, scenario='full', cache=None, models_dir=None, runtime='sklearn'):
+        models = get_models(models_dir, runtime)
+        if models.error:
+            raise SystemExit(f"❌ Could not load models:\n{models.error}")
+        self.model, self.metadata = models.choice(model_name)
+        self.scaler = models.scaler
+        if self.model is None:
+            raise SystemExit(f"❌ The {model_name} model is not available in {models.models_dir}")
+        self.scenario = scenario
+        self.cache = cache
+        # The app computes the risk surface once per model and caches it for all sessions
+        self.surface = grid_probabilities(self.model, self.metadata, self.scaler) if scenario == 'full' else None
+
+    def __call__(self, basic_input):
+        probability, _ = sensitivity_analysis(self.model, self.metadata, self.scaler, basic_input, cache=self.cache)
+        if self.scenario == 'full':
+            shapley_values(self.model, self.metadata, self.scaler, basic_input.iloc[0])
+            # Same branch, cutoff and (default) effort weights as the results page
+            if wants_counterfactual(probability[0], self.metadata):
+                counterfactual_search(self.surface, basic_input.iloc[0], threshold=risk_thresholds(self.metadata)[0],
+                                      weights=DEFAULT_EFFORT_WEIGHTS)
+        return probability
+
+
+def run_session(session_id, score, grid, dataset, csv_share, think_time, stop, results, lock, seed):
+    """One simulated analyst: score, think, repeat until stopped"""
+    rng = np.random.RandomState(seed + session_id)
+    latencies, errors, first_error = [], 0, None
+    while not stop.is_set():
+        pool = dataset if len(dataset) and rng.rand() < csv_share else grid
+        basic_input = pool.iloc[[rng.randint(len(pool))]].reset_index(drop=True)
+        start = time.perf_counter()
+        try:
+            score(basic_input)
+            latencies.append(time.perf_counter() - start)
+            metrics.increment("loadtest.requests")
+        except Exception as error:
+            errors += 1
+            first_error = first_error or f"{type(error).__name__}: {error}"
+        if think_time > 0:
+            stop.wait(rng.exponential(think_time))
+    with lock:
+        results['latencies'].extend(latencies)
+        results['errors'] += errors
+        results['first_error'] = results['first_error'] or first_error
+
+
+def sample_resources(start, interval, stop, samples, progress):
+    """CPU use and RSS of this process every interval seconds"""
+    last_wall, last_cpu = time.perf_counter(), time.process_time()
+    while not stop.wait(interval):
+        wall, cpu = time.perf_counter(), time.process_time()
+        samples.append({
+            'elapsed_s': round(wall - start, 2),
+            'requests': progress(),
+            'cpu_percent': round(100.0 * (cpu - last_cpu) / (wall - last_wall), 1),
+            'rss_mb': round(process_rss_bytes() / 1e6, 1),
+        })
+        last_wall, last_cpu = wall, cpu
+
+
+def load_test(model='ensemble', sessions=8, duration=20.0, think_time=0.0, csv_share=0.5, scenario='full',
+              cache_file=None, sample_interval=1.0, models_dir=None, runtime='sklearn', seed=42):
+    """Run the load test and return the report dict"""
+    cache = PredictionCache(cache_file) if cache_file else None
+    score = ScoringPath(model, scenario, cache, models_dir, runtime)
+    grid, dataset = input_pool(csv_share)
+
+    # Warm up (first calls pay for lazy imports and thread pools)
+    for i in range(5):
+        score(grid.iloc[[i * 100]].reset_index(drop=True))
+    metrics.reset()
+
+    results = {'latencies': [], 'errors': 0, 'first_error': None}
+    lock = threading.Lock()
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=run_session,
+                         args=(i, score, grid, dataset, csv_share, think_time, stop, results, lock, seed))
+        for i in range(sessions)
+    ]
+    samples = []
+    start = time.perf_counter()
+    sampler = threading.Thread(target=sample_resources,
+                               args=(start, sample_interval, stop, samples,
+                                     lambda: metrics.snapshot("loadtest.").get("loadtest.requests", 0)))
+    sampler.start()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    sampler.join()
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(results['latencies']) * 1000
+    has_latencies = len(latencies_ms) > 0
+    return {
+        'config': {
+            'model': model, 'sessions': sessions, 'duration_s': duration, 'think_time_s': think_time,
+            'csv_share': csv_share, 'scenario': scenario, 'cache_file': cache_file, 'runtime': runtime,
+        },
+        'requests': int(len(latencies_ms)),
+        'errors': results['errors'],
+        'first_error': results['first_error'],
+        'throughput_rps': round(len(latencies_ms) / elapsed, 2),
+        'latency_ms': {
+            name: round(float(np.percentile(latencies_ms, q)), 3) if has_latencies else None
+            for name, q in [('p50', 50), ('p95', 95), ('p99', 99), ('max', 100)]
+        },
+        'prediction_cache': metrics.snapshot("prediction_cache."),
+        'timeline': samples,
+    }
+
+
+def print_report(report):
+    config = report['config']
+    print(f"📊 {config['sessions']} sessions • {config['model']} • {config['scenario']} • "
+          f"think {config['think_time_s']}s • {config['csv_share']:.0%} dataset inputs")
+    print(f"   Requests: {report['requests']} ({report['errors']} errors) in {config['duration_s']}s")
+    print(f"   Throughput: {report['throughput_rps']:.1f} requests/s")
+    latency = report['latency_ms']
+    if latency['p50'] is not None:
+        print(f"   Latency: p50 {latency['p50']:.2f} ms • p95 {latency['p95']:.2f} ms • "
+              f"p99 {latency['p99']:.2f} ms • max {latency['max']:.2f} ms • {report['errors']} failed")
+    if report['errors']:
+        print(f"   ⚠️ {report['errors']} requests failed, first error: {report['first_error']}")
+    if report['prediction_cache']:
+        print(f"   Prediction cache: {report['prediction_cache']}")
+    if report['timeline']:
+        print(pd.DataFrame(report['timeline']).to_string(index=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the app's scoring path with simulated sessions")
+    parser.add_argument('--model', choices=list(MODEL_CHOICES), default='ensemble')
+    parser.add_argument('--sessions', type=int, default=8, help="Concurrent simulated sessions")
+    parser.add_argument('--duration', type=float, default=20.0, help="Seconds to run")
+    parser.add_argument('--think-time', type=float, default=0.0, help="Mean seconds between a session's requests")
+    parser.add_argument('--csv-share', type=float, default=0.5,
+                        help="Share of inputs drawn from the dataset rather than the 0/0.5/1 grid")
+    parser.add_argument('--scenario', choices=['predict', 'full'], default='full',
+                        help="predict: prediction and sensitivity only; full: everything the results page computes")
+    parser.add_argument('--cache', default=None, help="Use a prediction cache file (default: no cache)")
+    parser.add_argument('--sample-interval', type=float, default=1.0, help="Seconds between CPU/RSS samples")
+    parser.add_argument('--models-dir', default=None, help="Model artifacts (default: the version the app serves)")
+    parser.add_argument('--runtime', choices=['sklearn', 'numpy'], default=os.environ.get("BANKRUPTCY_RUNTIME", "sklearn"))
+    parser.add_argument('--json', default=None, help="Also write the full report to this file")
+    args = parser.parse_args()
+
+    report = load_test(args.model, args.sessions, args.duration, args.think_time, args.csv_share, args.scenario,
+                       args.cache, args.sample_interval, args.models_dir, args.runtime)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"✅ Saved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
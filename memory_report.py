@@ -0,0 +1,93 @@
+"""Memory diagnostics for capacity planning.
+
+Start the app with BANKRUPTCY_MEMORY_REPORT=1 to turn on tracemalloc before
+the models load and show the memory report at the bottom of the page. It
+lists the process RSS, what each model component allocated while loading
+(tracemalloc) and its current Python-visible size, the size of every active
+session's st.session_state, and the top allocation sites.
+"""
+import os
+import resource
+import tracemalloc
+
+import pandas as pd
+from streamlit.vendor.pympler.asizeof import asizeof
+
+COMPONENTS = ['ensemble_model', 'best_model', 'scaler', 'ensemble_metadata', 'best_model_metadata',
+              'student_model', 'student_metadata']
+
+
+def start_tracing(frames=1):
+    """Start tracemalloc if it is not already running"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def process_rss_bytes():
+    """Current resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes
+        return peak if peak > 1 << 30 else peak * 1024
+
+
+def _object_size(obj):
+    try:
+        return asizeof(obj)
+    except Exception:
+        return None
+
+
+def component_report(model_sets):
+    """One row per loaded model component: bytes allocated while loading and current Python size"""
+    rows = []
+    for models in model_sets:
+        # Loading steps that are not attributes (knn_index) only have the allocation figure
+        extra_steps = [name for name in models.memory if name not in COMPONENTS]
+        for component in COMPONENTS + extra_steps:
+            obj = getattr(models, component, None)
+            allocated = models.memory.get(component)
+            if obj is None and allocated is None:
+                continue
+            size = _object_size(obj) if obj is not None else None
+            rows.append({
+                'models_dir': models.models_dir,
+                'runtime': models.runtime,
+                'component': component,
+                'allocated_at_load_mb': allocated / 1e6 if allocated is not None else None,
+                'python_size_mb': size / 1e6 if size is not None else None,
+            })
+    return pd.DataFrame(rows)
+
+
+def session_report():
+    """One row per active Streamlit session with the size of its session state"""
+    try:
+        from streamlit.runtime import Runtime
+        sessions = Runtime.instance()._session_mgr.list_active_sessions()
+    except Exception:
+        return pd.DataFrame(columns=['session', 'keys', 'session_state_kb'])
+    rows = []
+    for info in sessions:
+        session_state = info.session.session_state
+        rows.append({
+            'session': info.session.id[:8],
+            'keys': len(session_state.filtered_state),
+            'session_state_kb': (_object_size(session_state) or 0) / 1e3,
+        })
+    return pd.DataFrame(rows)
+
+
+def top_allocations(limit=10):
+    """Largest live allocations grouped by source line (empty unless tracemalloc runs)"""
+    if not tracemalloc.is_tracing():
+        return pd.DataFrame(columns=['location', 'size_mb', 'blocks'])
+    stats = tracemalloc.take_snapshot().statistics('lineno')[:limit]
+    return pd.DataFrame([{
+        'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+        'size_mb': stat.size / 1e6,
+        'blocks': stat.count,
+    } for stat in stats])
@@ -0,0 +1,29 @@
+import threading
+from collections import defaultdict
+
+# ========================================
+# PROCESS-WIDE METRICS
+# ========================================
+# Named counters shared by every session in the server process. Names are
+# dotted, e.g. "prediction_cache.hits".
+
+_counters = defaultdict(int)
+_lock = threading.Lock()
+
+
+def increment(name, amount=1):
+    """Add amount to a counter"""
+    with _lock:
+        _counters[name] += amount
+
+
+def snapshot(prefix=""):
+    """Current value of every counter whose name starts with prefix"""
+    with _lock:
+        return {name: value for name, value in sorted(_counters.items()) if name.startswith(prefix)}
+
+
+def reset():
+    """Clear all counters"""
+    with _lock:
+        _counters.clear()
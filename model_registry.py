@@ -0,0 +1,278 @@
+"""Process-wide registry of loaded models.
+
+Every Streamlit session (and every offline tool) asks the registry for the
+models of a version directory; they are loaded once per process and shared,
+so st.session_state only has to hold per-user data. While tracemalloc is
+running, the memory allocated by each loading step is recorded per
+component for the memory report.
+
+Several segments (models/segments/<name>/) and versions can be served side
+by side: route() picks the directory for a request and get_models() loads it
+on first use. With a memory budget set, the least recently used model sets
+are dropped once the loaded total goes over it. Loads, hits, evictions and
+load errors are counted in metrics under "model_registry.".
+"""
+import importlib.util
+import os
+import pickle
+import threading
+import time
+import tracemalloc
+import traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import joblib
+
+import metrics
+from artifacts import (DEFAULT_SEGMENT, MODELS_DIR, artifact_bytes, fingerprint_files,
+                       latest_models_dir, load_pickle_or_joblib, model_segments, model_versions)
+from distill import LookupTableModel
+from export_numpy import export_fingerprint
+from features import grid_inputs
+from knn_index import KNN_INDEX_FILE, knn_index_fingerprint
+from numpy_runtime import NUMPY_ENSEMBLE_FILE, NumpyEnsemble
+from scoring import EnsembleRunner, prepare_input
+
+# Model choice name -> (ModelSet attribute, metadata attribute)
+MODEL_CHOICES = {
+    'ensemble': ('ensemble_model', 'ensemble_metadata'),
+    'knn': ('best_model', 'best_model_metadata'),
+    'student': ('student_model', 'student_metadata'),
+}
+
+# (models_dir, runtime) -> ModelSet, least recently used first
+_models = OrderedDict()
+_loading = {}
+_lock = threading.Lock()
+_memory_budget = 0
+
+
+class ModelSet:
+    """Everything the app loads from one model directory"""
+
+    def __init__(self, models_dir, runtime):
+        self.models_dir = models_dir
+        self.runtime = runtime
+        self.ensemble_model = None
+        self.best_model = None
+        self.scaler = None
+        self.ensemble_metadata = None
+        self.best_model_metadata = None
+        self.student_model = None
+        self.student_metadata = None
+        self.error = None
+        self.memory = {}
+        self.load_seconds = 0.0
+        self.footprint_bytes = 0
+
+    def choice(self, name):
+        """(model, metadata) for a MODEL_CHOICES name"""
+        model_attr, metadata_attr = MODEL_CHOICES[name]
+        return getattr(self, model_attr), getattr(self, metadata_attr)
+
+    def as_tuple(self):
+        return (self.ensemble_model, self.best_model, self.scaler, self.ensemble_metadata,
+                self.best_model_metadata, self.student_model, self.student_metadata)
+
+    @contextmanager
+    def _measure(self, component):
+        """Record the bytes allocated while loading one component (only while tracemalloc runs)"""
+        tracing = tracemalloc.is_tracing()
+        before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        try:
+            yield
+        finally:
+            if tracing:
+                self.memory[component] = self.memory.get(component, 0) + tracemalloc.get_traced_memory()[0] - before
+
+
+def sklearn_installed():
+    """Whether scikit-learn can be imported"""
+    return importlib.util.find_spec("sklearn") is not None
+
+
+def _is_voting_classifier(model):
+    """isinstance check that imports scikit-learn only when asked"""
+    from sklearn.ensemble import VotingClassifier
+    return isinstance(model, VotingClassifier)
+
+
+def load_model_set(models_dir, runtime="sklearn"):
+    """Load all models from models_dir; a failing step keeps what was loaded before it"""
+    models = ModelSet(models_dir, runtime)
+    start = time.perf_counter()
+    try:
+        # 1. Ensemble - runtime "numpy" serves the export from export_numpy.py,
+        # so xgboost and lightgbm are never imported
+        ensemble_file = os.path.join(models_dir, "ensemble_model.pkl")
+        numpy_ensemble_file = os.path.join(models_dir, NUMPY_ENSEMBLE_FILE)
+        with models._measure('ensemble_model'):
+            if runtime == "numpy" and os.path.exists(numpy_ensemble_file):
+                models.ensemble_model = NumpyEnsemble.load(numpy_ensemble_file)
+                # An export of older pickles would silently serve the old ensemble
+                if (os.path.exists(ensemble_file)
+                        and models.ensemble_model.source_fingerprint != export_fingerprint(models_dir)):
+                    models.ensemble_model = None
+                    raise RuntimeError(f"{numpy_ensemble_file} was exported from different model files - "
+                                       f"run python export_numpy.py --models-dir {models_dir}")
+            elif os.path.exists(ensemble_file):
+                models.ensemble_model = load_pickle_or_joblib(ensemble_file)
+            elif os.path.exists('bankruptcy_ensemble_model.pkl'):
+                # Fallback to root directory
+                models.ensemble_model = load_pickle_or_joblib('bankruptcy_ensemble_model.pkl')
+
+        # The numpy runtime serves without scikit-learn installed; the KNN pickles need it
+        sklearn_models = not isinstance(models.ensemble_model, NumpyEnsemble) or sklearn_installed()
+
+        # 2. Best single model (KNN)
+        best_model_files = [f for f in os.listdir(models_dir) if f.startswith("best_model_")]
+        with models._measure('best_model'):
+            if best_model_files and sklearn_models:
+                models.best_model = load_pickle_or_joblib(os.path.join(models_dir, best_model_files[0]))
+
+        # 3. Ensemble metadata
+        ensemble_metadata_file = os.path.join(models_dir, "ensemble_metadata.pkl")
+        with models._measure('ensemble_metadata'):
+            if os.path.exists(ensemble_metadata_file):
+                with open(ensemble_metadata_file, 'rb') as file:
+                    models.ensemble_metadata = pickle.load(file)
+
+        # 4. Best model metadata
+        best_model_metadata_file = os.path.join(models_dir, "model_metadata.pkl")
+        with models._measure('best_model_metadata'):
+            if os.path.exists(best_model_metadata_file):
+                with open(best_model_metadata_file, 'rb') as file:
+                    models.best_model_metadata = pickle.load(file)
+
+        # 5. Scaler - the export's copy for the numpy runtime (it was checked against the file above)
+        scaler_file = os.path.join(models_dir, "feature_scaler.pkl")
+        with models._measure('scaler'):
+            if isinstance(models.ensemble_model, NumpyEnsemble):
+                models.scaler = models.ensemble_model.scaler()
+            elif os.path.exists(scaler_file):
+                models.scaler = load_pickle_or_joblib(scaler_file)
+
+        # 6. Distilled student model (optional - created by distill.py)
+        student_file = os.path.join(models_dir, "student_model.pkl")
+        student_metadata_file = os.path.join(models_dir, "student_metadata.pkl")
+        with models._measure('student_model'):
+            if os.path.exists(student_file) and os.path.exists(student_metadata_file):
+                models.student_model = joblib.load(student_file)
+                with open(student_metadata_file, 'rb') as file:
+                    models.student_metadata = pickle.load(file)
+
+        # 7. Grid KNN index (optional - created by knn_index.py), same predictions as the full KNN;
+        # an index built from other model files is ignored
+        knn_indexes = {}
+        knn_index_file = os.path.join(models_dir, KNN_INDEX_FILE)
+        with models._measure('knn_index'):
+            if os.path.exists(knn_index_file) and sklearn_models:
+                knn_indexes = joblib.load(knn_index_file)
+                if knn_indexes.get('fingerprint') != knn_index_fingerprint(models_dir):
+                    knn_indexes = {}
+                    metrics.increment("model_registry.stale_knn_index")
+                models.best_model = knn_indexes.get('best_model', models.best_model)
+
+        # 8. Native booster fast path for the ensemble (checked against the wrapper path)
+        with models._measure('ensemble_model'):
+            if sklearn_models and _is_voting_classifier(models.ensemble_model) and models.scaler is not None:
+                probe_X = prepare_input(grid_inputs(), models.ensemble_metadata, models.scaler)
+                member_overrides = {'knn': knn_indexes['ensemble_knn']} if 'ensemble_knn' in knn_indexes else None
+                models.ensemble_model = EnsembleRunner(models.ensemble_model, probe_X, member_overrides)
+
+        # The lookup-table student only knows the grid; off-grid rows go to its teacher
+        if isinstance(models.student_model, LookupTableModel):
+            models.student_model.teacher = models.ensemble_model
+
+        # 9. Fingerprint each model's artifacts - keys process-wide caches such as the risk surface;
+        # the files are kept too, so long-running work (jobs.py) can check they have not changed since
+        if isinstance(models.ensemble_model, NumpyEnsemble):
+            ensemble_source = numpy_ensemble_file
+        elif os.path.exists(ensemble_file):
+            ensemble_source = ensemble_file
+        else:
+            ensemble_source = 'bankruptcy_ensemble_model.pkl'
+        best_model_source = os.path.join(models_dir, best_model_files[0]) if best_model_files else None
+        # The student answers off-grid rows with its teacher, so its results also depend on the ensemble
+        for metadata, model_sources in [(models.ensemble_metadata, [ensemble_source]),
+                                        (models.best_model_metadata, [best_model_source]),
+                                        (models.student_metadata, [student_file, ensemble_source])]:
+            if metadata is not None:
+                metadata['fingerprint'] = fingerprint_files(*model_sources, scaler_file)
+                metadata['fingerprint_files'] = [*model_sources, scaler_file]
+    except Exception:
+        models.error = traceback.format_exc()
+    models.load_seconds = time.perf_counter() - start
+    # Traced allocations when available, otherwise the size of the files on disk
+    models.footprint_bytes = sum(models.memory.values()) or (
+        artifact_bytes(models_dir) if os.path.isdir(models_dir) else 0)
+    return models
+
+
+def set_memory_budget(budget_bytes):
+    """Keep the loaded model sets under budget_bytes (0 = no limit); applies from the next load"""
+    global _memory_budget
+    with _lock:
+        _memory_budget = max(0, int(budget_bytes))
+
+
+def _evict_over_budget():
+    # Called with _lock held, right after the newest set was appended; it is never evicted
+    while _memory_budget and len(_models) > 1 and sum(m.footprint_bytes for m in _models.values()) > _memory_budget:
+        _models.popitem(last=False)
+        metrics.increment("model_registry.evictions")
+
+
+def get_models(models_dir=None, runtime="sklearn"):
+    """Shared ModelSet for models_dir (default: the version the app serves), loaded on first use"""
+    key = (models_dir or latest_models_dir(), runtime)
+    with _lock:
+        if key in _models:
+            _models.move_to_end(key)
+            metrics.increment("model_registry.hits")
+            return _models[key]
+        key_lock = _loading.setdefault(key, threading.Lock())
+
+    # Load outside the registry lock so sessions using other model sets are not blocked
+    with key_lock:
+        with _lock:
+            if key in _models:
+                _models.move_to_end(key)
+                metrics.increment("model_registry.hits")
+                return _models[key]
+        models = load_model_set(*key)
+        metrics.increment("model_registry.loads")
+        if models.error:
+            metrics.increment("model_registry.load_errors")
+        with _lock:
+            _models[key] = models
+            _loading.pop(key, None)
+            _evict_over_budget()
+    return models
+
+
+def route(segment=None, version=None, models_dir=MODELS_DIR):
+    """Artifact directory for a request: the segment's models (unknown segments fall back to
+    DEFAULT_SEGMENT) at the given version, or its LATEST version when version is None"""
+    segments = model_segments(models_dir)
+    if segment not in (None, DEFAULT_SEGMENT) and segment not in segments:
+        metrics.increment("model_registry.route_fallbacks")
+    segment_dir = segments.get(segment, models_dir)
+    if version is None:
+        return latest_models_dir(segment_dir)
+    versions = model_versions(segment_dir)
+    if version not in versions:
+        raise KeyError(f"No model version {version!r} for segment {segment or DEFAULT_SEGMENT!r}")
+    return versions[version]
+
+
+def available_models(models_dir=MODELS_DIR):
+    """Segment name -> list of version names that route() accepts (BASE_VERSION first)"""
+    return {segment: list(model_versions(segment_dir)) for segment, segment_dir in model_segments(models_dir).items()}
+
+
+def loaded_model_sets():
+    """Every ModelSet loaded in this process"""
+    with _lock:
+        return list(_models.values())
@@ -0,0 +1,173 @@
+"""Pure-NumPy evaluator for the exported soft-voting ensemble.
+
+This module imports only numpy. The export also holds the StandardScaler's
+mean and scale, so with runtime "numpy" the model registry scales and scores
+ensemble requests without xgboost, lightgbm or scikit-learn installed (the
+KNN pickles still need scikit-learn and are skipped without it). The arrays
+are produced by export_numpy.py from the fitted ensemble_model.pkl.
+"""
+import json
+
+import numpy as np
+
+NUMPY_ENSEMBLE_FILE = "ensemble_numpy.npz"
+
+
+# ========================================
+# MEMBER EVALUATORS
+# ========================================
+# Every member returns P(class 1) for each row; the ensemble stacks them as
+# [1 - p, p] and averages, exactly like VotingClassifier(voting='soft').
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def _logistic_proba(X, arrays, spec):
+    return _sigmoid(X @ arrays['coef'] + arrays['intercept'][0])
+
+
+def _knn_proba(X, arrays, spec):
+    fit_X = arrays['fit_X']
+    distances = (X ** 2).sum(axis=1)[:, None] - 2.0 * X @ fit_X.T + (fit_X ** 2).sum(axis=1)[None, :]
+    # Stable sort keeps the training order among equidistant neighbors
+    neighbors = np.argsort(distances, axis=1, kind='stable')[:, :spec['n_neighbors']]
+    return (arrays['y'][neighbors] == 1).mean(axis=1)
+
+
+def _svm_proba(X, arrays, spec):
+    sv = arrays['support_vectors']
+    sq_dist = (X ** 2).sum(axis=1)[:, None] - 2.0 * X @ sv.T + (sv ** 2).sum(axis=1)[None, :]
+    decision = np.exp(-spec['gamma'] * sq_dist) @ arrays['dual_coef'] + arrays['intercept'][0]
+    # libsvm's Platt scaling, including its clipping of pairwise probabilities
+    f = decision * arrays['prob_a'][0] + arrays['prob_b'][0]
+    with np.errstate(over='ignore'):
+        p_first = np.where(f >= 0, np.exp(-f) / (1.0 + np.exp(-f)), 1.0 / (1.0 + np.exp(f)))
+    p_first = np.clip(p_first, 1e-7, 1 - 1e-7)
+    return _libsvm_coupling(p_first)[:, 1]
+
+
+def _libsvm_coupling(r01, max_iter=100):
+    """libsvm's multiclass_probability for 2 classes, run row-wise
+
+    scikit-learn's bundled libsvm couples the pairwise probability even in
+    the binary case, which moves it by up to ~0.005 (eps = 0.005 / k).
+    """
+    k = 2
+    r10 = 1.0 - r01
+    Q = np.empty((len(r01), k, k))
+    Q[:, 0, 0] = r10 * r10
+    Q[:, 1, 1] = r01 * r01
+    Q[:, 0, 1] = Q[:, 1, 0] = -r10 * r01
+    p = np.full((len(r01), k), 1.0 / k)
+    active = np.ones(len(r01), dtype=bool)
+    for _ in range(max_iter):
+        Qp = np.einsum('ntj,nj->nt', Q, p)
+        pQp = (p * Qp).sum(axis=1)
+        active &= np.abs(Qp - pQp[:, None]).max(axis=1) >= 0.005 / k
+        if not active.any():
+            break
+        for t in range(k):
+            diff = np.where(active, (-Qp[:, t] + pQp) / Q[:, t, t], 0.0)
+            p[:, t] += diff
+            pQp = (pQp + diff * (diff * Q[:, t, t] + 2 * Qp[:, t])) / (1 + diff) / (1 + diff)
+            Qp = (Qp + diff[:, None] * Q[:, t, :]) / (1 + diff)[:, None]
+            p /= (1 + diff)[:, None]
+    return p
+
+
+def tree_leaves(X, arrays):
+    """Leaf index reached by every row in every tree, shape (n_trees, n_rows)"""
+    feature, threshold = arrays['feature'], arrays['threshold']
+    left, right = arrays['left'], arrays['right']
+    rows = np.arange(X.shape[0])[None, :]
+    nodes = np.repeat(arrays['roots'][:, None], X.shape[0], axis=1)
+    while True:
+        node_feature = feature[nodes]
+        internal = node_feature >= 0
+        if not internal.any():
+            return nodes
+        go_left = X[rows, np.maximum(node_feature, 0)] <= threshold[nodes]
+        nodes = np.where(internal, np.where(go_left, left[nodes], right[nodes]), nodes)
+
+
+def _tree_ensemble_proba(X, arrays, spec):
+    if spec['input_dtype'] == 'float32':
+        X = X.astype(np.float32).astype(np.float64)
+    leaf_values = arrays['value'][tree_leaves(X, arrays)]
+    if spec['output'] == 'mean_proba':
+        return leaf_values.mean(axis=0)
+    if spec['output'] == 'xgboost':
+        margin = np.float32(spec['base_margin']) + leaf_values.astype(np.float32).sum(axis=0, dtype=np.float32)
+        return (np.float32(1.0) / (np.float32(1.0) + np.exp(-margin))).astype(np.float64)
+    raw = leaf_values.sum(axis=0)
+    return _sigmoid(spec['sigmoid'] * raw)
+
+
+MEMBER_EVALUATORS = {
+    'logistic': _logistic_proba,
+    'knn': _knn_proba,
+    'svm': _svm_proba,
+    'trees': _tree_ensemble_proba,
+}
+
+
+# ========================================
+# ENSEMBLE
+# ========================================
+
+class NumpyScaler:
+    """Drop-in replacement for the fitted StandardScaler's transform"""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class NumpyEnsemble:
+    """Drop-in replacement for the fitted VotingClassifier's predict / predict_proba"""
+
+    def __init__(self, spec, arrays):
+        self.spec = spec
+        self.arrays = arrays
+        self.classes_ = np.array(spec['classes'])
+        # Hash of the pickles this was exported from (None for exports older than the check)
+        self.source_fingerprint = spec.get('source_fingerprint')
+        self.members = [
+            (member['name'], MEMBER_EVALUATORS[member['kind']], member, arrays[member['name']])
+            for member in spec['members']
+        ]
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path, allow_pickle=False)
+        spec = json.loads(str(data['__spec__']))
+        arrays = {}
+        for key in data.files:
+            if key == '__spec__':
+                continue
+            member, name = key.split('__', 1)
+            arrays.setdefault(member, {})[name] = data[key]
+        return cls(spec, arrays)
+
+    def scaler(self):
+        """The StandardScaler exported with the ensemble"""
+        return NumpyScaler(self.arrays['scaler']['mean'], self.arrays['scaler']['scale'])
+
+    def member_probas(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        probas = {}
+        for name, evaluate, member, arrays in self.members:
+            p = evaluate(X, arrays, member)
+            probas[name] = np.column_stack([1.0 - p, p])
+        return probas
+
+    def predict_proba(self, X):
+        probas = np.asarray(list(self.member_probas(X).values()))
+        return np.average(probas, axis=0, weights=self.spec.get('weights'))
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -0,0 +1,214 @@
+"""Daily portfolio scoring that only rescores companies whose inputs changed.
+
+Usage:
+    python portfolio.py companies.csv                       # portfolio "default", ensemble
+    python portfolio.py companies.csv --name retail --model knn --output scored.csv
+
+The CSV needs a company_id column and the 6 risk factors. Each run is
+compared with the previous run of the same portfolio and model (saved under
+portfolios/): rows are matched by company ID and a hash of the 6 inputs, and
+only new or changed companies are scored, in one batch. The risk level
+counts and the probability histogram are updated by removing the old
+contribution of every changed or removed company and adding the new one, so
+the work grows with the size of the change rather than the portfolio. If the
+model files changed since the last run, everything is rescored.
+"""
+import argparse
+import os
+import pickle
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from features import BASIC_FEATURES
+from model_registry import MODEL_CHOICES, get_models
+from scoring import prepare_input, risk_levels, risk_thresholds
+
+PORTFOLIO_DIR = "portfolios"
+ID_COLUMN = 'company_id'
+PROBABILITY_BINS = np.linspace(0.0, 1.0, 21)
+RISK_LEVEL_NAMES = ['LOW RISK', 'MEDIUM RISK', 'HIGH RISK']
+
+
+def portfolio_path(name, model_name, directory=PORTFOLIO_DIR):
+    """File holding the last run of a portfolio for one model choice"""
+    return os.path.join(directory, f"{name}-{model_name}.pkl")
+
+
+def read_portfolio(source):
+    """Company IDs and the 6 raw inputs from a CSV path or file object, one row per company"""
+    portfolio = pd.read_csv(source)
+    missing = [column for column in [ID_COLUMN] + BASIC_FEATURES if column not in portfolio.columns]
+    if missing:
+        raise ValueError(f"Portfolio is missing columns: {', '.join(missing)}")
+    portfolio = portfolio[[ID_COLUMN] + BASIC_FEATURES].copy()
+    portfolio[ID_COLUMN] = portfolio[ID_COLUMN].astype(str)
+    portfolio[BASIC_FEATURES] = portfolio[BASIC_FEATURES].astype(np.float64)
+    if portfolio[ID_COLUMN].duplicated().any():
+        raise ValueError("Portfolio has duplicate company IDs")
+    if not ((portfolio[BASIC_FEATURES] >= 0) & (portfolio[BASIC_FEATURES] <= 1)).all().all():
+        raise ValueError("Risk factors must be between 0 and 1")
+    return portfolio.set_index(ID_COLUMN)
+
+
+def input_hashes(inputs):
+    """64-bit hash of each row's 6 inputs (-0.0 and 0.0 hash the same)"""
+    return pd.util.hash_pandas_object(inputs[BASIC_FEATURES] + 0.0, index=False).to_numpy()
+
+
+def _histogram(bankruptcy_prob):
+    return np.histogram(bankruptcy_prob, bins=PROBABILITY_BINS)[0]
+
+
+def _level_counts(levels):
+    return np.bincount(np.asarray(levels, dtype=np.int64), minlength=len(RISK_LEVEL_NAMES))
+
+
+def rescore_portfolio(portfolio, previous, model, metadata, scaler):
+    """Score a portfolio, reusing the previous run for unchanged companies
+
+    portfolio comes from read_portfolio; previous is the (results, summary)
+    of the last run or None. Returns the new (results, summary): results has
+    one row per company with its inputs, hash, bankruptcy probability, risk
+    level and the previous risk level; summary holds the aggregate counts,
+    the histogram and what changed.
+    """
+    start = time.perf_counter()
+    fingerprint = metadata.get('fingerprint') if metadata else None
+    hashes = input_hashes(portfolio)
+    if previous is not None and previous[1].get('fingerprint') != fingerprint:
+        previous = None
+    old_results, old_summary = previous if previous is not None else (None, None)
+
+    previous_level = np.full(len(portfolio), -1, dtype=np.int64)
+    if old_results is None:
+        to_score = np.ones(len(portfolio), dtype=bool)
+        removed = pd.Index([])
+    else:
+        known = portfolio.index.isin(old_results.index)
+        matched = old_results.loc[portfolio.index[known]]
+        to_score = ~known
+        to_score[known] = matched['input_hash'].to_numpy() != hashes[known]
+        previous_level[known] = matched['risk_level'].to_numpy()
+        removed = old_results.index.difference(portfolio.index)
+
+    results = pd.DataFrame(portfolio[BASIC_FEATURES])
+    results['input_hash'] = hashes
+    results['bankruptcy_prob'] = np.nan
+    results['risk_level'] = -1
+    if old_results is not None:
+        kept = old_results.loc[portfolio.index[~to_score]]
+        results.loc[~to_score, 'bankruptcy_prob'] = kept['bankruptcy_prob'].to_numpy()
+        results.loc[~to_score, 'risk_level'] = kept['risk_level'].to_numpy()
+
+    thresholds = risk_thresholds(metadata)
+    if to_score.any():
+        proba = model.predict_proba(prepare_input(portfolio.loc[to_score, BASIC_FEATURES].reset_index(drop=True),
+                                                  metadata, scaler))
+        results.loc[to_score, 'bankruptcy_prob'] = proba[:, 0]
+        results.loc[to_score, 'risk_level'] = risk_levels(proba[:, 0], thresholds)
+    results['risk_level'] = results['risk_level'].astype(np.int64)
+    results['previous_level'] = previous_level
+
+    # Aggregates: start from the previous run and apply only the differences
+    if old_summary is None:
+        level_counts = _level_counts(results['risk_level'])
+        histogram = _histogram(results['bankruptcy_prob'])
+        probability_sum = float(results['bankruptcy_prob'].sum())
+    else:
+        changed_ids = portfolio.index[to_score & (previous_level >= 0)]
+        outgoing = old_results.loc[changed_ids.append(removed)]
+        incoming = results[to_score]
+        level_counts = (np.asarray(old_summary['level_counts']) - _level_counts(outgoing['risk_level'])
+                        + _level_counts(incoming['risk_level']))
+        histogram = (np.asarray(old_summary['histogram']) - _histogram(outgoing['bankruptcy_prob'])
+                     + _histogram(incoming['bankruptcy_prob']))
+        probability_sum = (old_summary['probability_sum'] - float(outgoing['bankruptcy_prob'].sum())
+                           + float(incoming['bankruptcy_prob'].sum()))
+
+    crossed = (previous_level >= 0) & (previous_level != results['risk_level'].to_numpy())
+    summary = {
+        'fingerprint': fingerprint,
+        'run_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'companies': len(results),
+        'new': int((to_score & (previous_level < 0)).sum()) if old_results is not None else len(results),
+        'changed': int((to_score & (previous_level >= 0)).sum()),
+        'removed': len(removed),
+        'rescored': int(to_score.sum()),
+        'full_rescore': old_results is None,
+        'crossed': int(crossed.sum()),
+        'level_counts': level_counts.tolist(),
+        'previous_level_counts': list(old_summary['level_counts']) if old_summary else None,
+        'histogram': histogram.tolist(),
+        'probability_sum': probability_sum,
+        'mean_bankruptcy_prob': probability_sum / len(results) if len(results) else float('nan'),
+        'seconds': time.perf_counter() - start,
+    }
+    return results, summary
+
+
+def risk_crossings(results):
+    """Companies whose risk level differs from the previous run, biggest moves first"""
+    crossed = results[(results['previous_level'] >= 0) & (results['previous_level'] != results['risk_level'])]
+    crossed = crossed.assign(direction=np.where(crossed['risk_level'] > crossed['previous_level'], 'up', 'down'),
+                             move=(crossed['risk_level'] - crossed['previous_level']).abs())
+    return crossed.sort_values(['move', 'bankruptcy_prob'], ascending=False).drop(columns='move')
+
+
+def load_portfolio_run(path):
+    """(results, summary) of the last saved run, or None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+def save_portfolio_run(path, results, summary):
+    """Save a run for the next incremental update (atomically)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as file:
+        pickle.dump((results, summary), file)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a portfolio CSV, rescoring only companies that changed")
+    parser.add_argument('portfolio_file')
+    parser.add_argument('--name', default='default', help="Portfolio name; runs are compared per name and model")
+    parser.add_argument('--model', choices=list(MODEL_CHOICES), default='ensemble')
+    parser.add_argument('--models-dir', default=None, help="Model artifacts (default: the version the app serves)")
+    parser.add_argument('--runtime', choices=['sklearn', 'numpy'], default='sklearn')
+    parser.add_argument('--output', default=None, help="Write the scored portfolio to this CSV")
+    args = parser.parse_args()
+
+    models = get_models(args.models_dir, args.runtime)
+    if models.error:
+        raise SystemExit(f"❌ Could not load models:\n{models.error}")
+    model, metadata = models.choice(args.model)
+    path = portfolio_path(args.name, args.model)
+    results, summary = rescore_portfolio(read_portfolio(args.portfolio_file), load_portfolio_run(path),
+                                         model, metadata, models.scaler)
+    save_portfolio_run(path, results, summary)
+
+    print(f"📁 {summary['companies']} companies in {summary['seconds'] * 1000:.1f} ms: "
+          f"{summary['rescored']} rescored ({summary['new']} new, {summary['changed']} changed), "
+          f"{summary['removed']} removed" + (" - full rescore" if summary['full_rescore'] else ""))
+    print("   " + " • ".join(f"{name} {count}" for name, count in zip(RISK_LEVEL_NAMES, summary['level_counts'])))
+    crossings = risk_crossings(results)
+    if len(crossings):
+        print(f"⚠️ {len(crossings)} companies changed risk level:")
+        for company_id, row in crossings.iterrows():
+            print(f"   {company_id}: {RISK_LEVEL_NAMES[int(row['previous_level'])]} → "
+                  f"{RISK_LEVEL_NAMES[int(row['risk_level'])]} ({row['bankruptcy_prob']:.1%})")
+    if args.output:
+        results.to_csv(args.output)
+        print(f"✅ Saved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
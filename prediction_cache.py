@@ -0,0 +1,156 @@
+"""Disk-backed prediction cache that survives restarts and redeploys.
+
+Probabilities are stored in a SQLite file keyed by the model's artifact
+fingerprint and the 6 raw inputs, so a new model version never reads old
+results. A small in-memory LRU sits in front of the file. SQLite's WAL mode
+lets several server processes read and write the same file at once; if the
+file is locked for too long the cache is skipped rather than blocking the
+prediction. The file keeps the most recently written MAX_DISK_ROWS entries;
+older ones are deleted when the cache is opened and every PRUNE_INTERVAL
+writes.
+"""
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import metrics
+from artifacts import MODELS_DIR
+
+PREDICTION_CACHE_FILE = os.path.join(MODELS_DIR, "prediction_cache.sqlite")
+MEMORY_CACHE_SIZE = 4096
+MAX_DISK_ROWS = 200_000  # about 30 MB
+PRUNE_INTERVAL = 1000
+
+
+def encode_inputs(row):
+    """Cache key bytes for one row of the 6 raw inputs"""
+    # Adding 0.0 turns -0.0 into 0.0 so both encode the same way
+    return (np.asarray(row, dtype=np.float64) + 0.0).tobytes()
+
+
+class PredictionCache:
+    """predict_proba results keyed by (model fingerprint, raw inputs)"""
+
+    def __init__(self, path=PREDICTION_CACHE_FILE, memory_size=MEMORY_CACHE_SIZE, timeout=0.5, max_rows=MAX_DISK_ROWS):
+        self.path = path
+        self.memory_size = memory_size
+        self.timeout = timeout
+        self.max_rows = max_rows
+        self._writes_since_prune = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            # Files from before the row cap have no rowid to order by; the entries are only a cache
+            old_table = connection.execute("SELECT sql FROM sqlite_master WHERE name = 'predictions'").fetchone()
+            if old_table and "WITHOUT ROWID" in old_table[0].upper():
+                connection.execute("DROP TABLE predictions")
+            # INSERT OR REPLACE gives a rewritten entry a new rowid, so rowid order is write order
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS predictions (
+                    model TEXT NOT NULL,
+                    inputs BLOB NOT NULL,
+                    proba BLOB NOT NULL,
+                    PRIMARY KEY (model, inputs)
+                )
+            """)
+        self.prune()
+
+    def _connection(self):
+        """One connection per thread (sqlite3 connections are not shared across threads)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _remember(self, key, proba):
+        with self._lock:
+            self._memory[key] = proba
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def get_many(self, model_hash, rows):
+        """Cached probability rows for each input row, None where there is no entry"""
+        keys = [encode_inputs(row) for row in rows]
+        results = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                proba = self._memory.get((model_hash, key))
+                if proba is None:
+                    missing.append(i)
+                else:
+                    self._memory.move_to_end((model_hash, key))
+                    results[i] = proba
+        metrics.increment("prediction_cache.memory_hits", len(keys) - len(missing))
+
+        disk_hits = 0
+        if missing:
+            try:
+                placeholders = ",".join("?" * len(missing))
+                found = dict(self._connection().execute(
+                    f"SELECT inputs, proba FROM predictions WHERE model = ? AND inputs IN ({placeholders})",
+                    [model_hash] + [keys[i] for i in missing],
+                ).fetchall())
+            except sqlite3.Error:
+                metrics.increment("prediction_cache.errors")
+                found = {}
+            for i in missing:
+                blob = found.get(keys[i])
+                if blob is not None:
+                    results[i] = np.frombuffer(blob, dtype=np.float64)
+                    self._remember((model_hash, keys[i]), results[i])
+                    disk_hits += 1
+        metrics.increment("prediction_cache.disk_hits", disk_hits)
+        metrics.increment("prediction_cache.misses", len(missing) - disk_hits)
+        return results
+
+    def put_many(self, model_hash, rows, probas):
+        """Store probability rows for the given input rows"""
+        entries = []
+        for row, proba in zip(rows, probas):
+            key = encode_inputs(row)
+            proba = np.array(proba, dtype=np.float64)
+            self._remember((model_hash, key), proba)
+            entries.append((model_hash, key, proba.tobytes()))
+        try:
+            with self._connection() as connection:
+                connection.executemany("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)", entries)
+        except sqlite3.Error:
+            metrics.increment("prediction_cache.errors")
+            return
+        with self._lock:
+            self._writes_since_prune += len(entries)
+            due = self._writes_since_prune >= PRUNE_INTERVAL
+            if due:
+                self._writes_since_prune = 0
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Delete all but the newest max_rows entries; returns how many were deleted"""
+        try:
+            with self._connection() as connection:
+                deleted = connection.execute(
+                    "DELETE FROM predictions WHERE rowid <= "
+                    "(SELECT rowid FROM predictions ORDER BY rowid DESC LIMIT 1 OFFSET ?)",
+                    (self.max_rows,),
+                ).rowcount
+        except sqlite3.Error:
+            metrics.increment("prediction_cache.errors")
+            return 0
+        metrics.increment("prediction_cache.pruned", deleted)
+        return deleted
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
@@ -0,0 +1,133 @@
+"""Replay captured scoring requests against any model artifacts.
+
+Usage:
+    python replay.py requests.jsonl                      # as fast as possible, served version
+    python replay.py requests.jsonl --speed 1            # original timing
+    python replay.py requests.jsonl --models-dir models/versions/v0002 --diff diff.csv
+
+Every captured request is scored again with the same model choice (or
+--model), and the new bankruptcy probability is compared with the captured
+one: largest change, label flips and risk level changes. Requests the app
+served from the dense slider grid are counted separately, since their
+change includes the interpolation error. That turns real
+traffic into a benchmark and a regression check between model versions.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from capture import read_capture
+from features import BASIC_FEATURES
+from model_registry import MODEL_CHOICES, get_models
+from scoring import prepare_input, risk_levels, risk_thresholds
+
+
+def replay(records, models_dir=None, model=None, speed=0.0, runtime='sklearn'):
+    """Re-score captured records; speed 1 keeps the original gaps, 0 sends them back to back
+
+    Returns a DataFrame with one row per record: captured and replayed
+    probabilities, their difference and the replay latency. Records whose
+    model could not be loaded are skipped and counted in
+    attrs['model_unavailable']; attrs['load_error'] holds the load error.
+    """
+    models = get_models(models_dir, runtime)
+
+    rows = []
+    unavailable = 0
+    start_wall = time.perf_counter()
+    first_ts = records[0]['ts'] if records else 0.0
+    for record in records:
+        if speed > 0:
+            delay = (record['ts'] - first_ts) / speed - (time.perf_counter() - start_wall)
+            if delay > 0:
+                time.sleep(delay)
+        choice = model or record.get('model', 'ensemble')
+        active_model, metadata = models.choice(choice)
+        if active_model is None or models.scaler is None:
+            unavailable += 1
+            continue
+        basic_input = pd.DataFrame([record['inputs']], columns=BASIC_FEATURES)
+        start = time.perf_counter()
+        probability = active_model.predict_proba(prepare_input(basic_input, metadata, models.scaler))[0]
+        latency_ms = (time.perf_counter() - start) * 1000
+        # Both probabilities are banded with the replayed model's cutoffs
+        captured_level, replayed_level = risk_levels([record['bankruptcy_prob'], probability[0]],
+                                                     risk_thresholds(metadata))
+        rows.append({
+            'ts': record['ts'],
+            'model': choice,
+            **dict(zip(BASIC_FEATURES, record['inputs'])),
+            'captured_prob': record['bankruptcy_prob'],
+            'replayed_prob': probability[0],
+            'captured_prediction': record.get('prediction'),
+            'replayed_prediction': int(active_model.classes_[np.argmax(probability)]),
+            'captured_risk_level': int(captured_level),
+            'replayed_risk_level': int(replayed_level),
+            'captured_latency_ms': record.get('latency_ms'),
+            'captured_source': record.get('source', 'exact'),
+            'replayed_latency_ms': latency_ms,
+        })
+    results = pd.DataFrame(rows)
+    if len(results):
+        results['prob_diff'] = results['replayed_prob'] - results['captured_prob']
+    results.attrs['model_unavailable'] = unavailable
+    results.attrs['load_error'] = models.error
+    return results
+
+
+def summarize(results):
+    """Benchmark and regression summary of a replay"""
+    latency = results['replayed_latency_ms']
+    return {
+        'requests': len(results),
+        'model_unavailable': results.attrs.get('model_unavailable', 0),
+        'interpolated_requests': int((results['captured_source'] == 'interpolated').sum()),
+        'latency_p50_ms': float(latency.quantile(0.5)),
+        'latency_p95_ms': float(latency.quantile(0.95)),
+        'latency_p99_ms': float(latency.quantile(0.99)),
+        'max_abs_prob_diff': float(results['prob_diff'].abs().max()),
+        'label_changes': int((results['captured_prediction'] != results['replayed_prediction']).sum()),
+        'risk_level_changes': int((results['captured_risk_level'] != results['replayed_risk_level']).sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a captured requests.jsonl against model artifacts")
+    parser.add_argument('capture_file')
+    parser.add_argument('--models-dir', default=None, help="Model artifacts (default: the version the app serves)")
+    parser.add_argument('--model', choices=list(MODEL_CHOICES), default=None,
+                        help="Score every request with this model (default: the captured choice)")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="1 = original timing, 2 = twice as fast, 0 = as fast as possible (default)")
+    parser.add_argument('--runtime', choices=['sklearn', 'numpy'], default='sklearn')
+    parser.add_argument('--diff', default=None, help="Write the per-request comparison to this CSV")
+    args = parser.parse_args()
+
+    records = read_capture(args.capture_file)
+    if not records:
+        raise SystemExit(f"❌ No captured requests in {args.capture_file}")
+    results = replay(records, args.models_dir, args.model, args.speed, args.runtime)
+    if results.attrs['load_error']:
+        print(f"⚠️ Some models could not be loaded:\n{results.attrs['load_error']}")
+    if not len(results):
+        raise SystemExit(f"❌ None of the {len(records)} requests could be replayed: their model is not available")
+    summary = summarize(results)
+    print(f"📊 Replayed {summary['requests']} requests")
+    if summary['model_unavailable']:
+        print(f"   {summary['model_unavailable']} skipped: model unavailable")
+    if summary['interpolated_requests']:
+        print(f"   {summary['interpolated_requests']} were served interpolated from the slider grid; "
+              f"their probability change includes the interpolation error")
+    print(f"   Latency: p50 {summary['latency_p50_ms']:.2f} ms • p95 {summary['latency_p95_ms']:.2f} ms • "
+          f"p99 {summary['latency_p99_ms']:.2f} ms")
+    print(f"   Largest probability change: {summary['max_abs_prob_diff']:.2e}")
+    print(f"   Label changes: {summary['label_changes']} • Risk level changes: {summary['risk_level_changes']}")
+    if args.diff:
+        results.to_csv(args.diff, index=False)
+        print(f"✅ Saved {args.diff}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from math import factorial
+
+import numpy as np
+import pandas as pd
+
+from features import BASIC_FEATURES, GRID_VALUES, create_features, grid_inputs
+
+# ========================================
+# SCORING CORE
+# ========================================
+# Shared by the app and the offline tools: turn raw inputs into the scaled
+# feature matrix the models expect, and run the models on it.
+
+
+def prepare_input(basic_input, metadata, scaler):
+    """Engineer and scale features for a DataFrame of raw inputs (any number of rows)"""
+    input_featured = create_features(basic_input)
+
+    if metadata and 'features' in metadata:
+        input_features = metadata['features']
+        for feat in input_features:
+            if feat not in input_featured.columns:
+                input_featured[feat] = 0
+        input_data = input_featured[input_features]
+    else:
+        input_data = input_featured.select_dtypes(include=np.number)
+
+    if scaler:
+        return scaler.transform(input_data)
+    return input_data.values
+
+
+def cached_predict_proba(model, metadata, scaler, basic_input, cache=None):
+    """predict_proba for raw input rows, served from the prediction cache where possible
+
+    Rows missing from the cache are scored together in one call and stored.
+    Without a cache or a model fingerprint this is a plain predict_proba.
+    """
+    model_hash = metadata.get('fingerprint') if metadata else None
+    if cache is None or model_hash is None:
+        return model.predict_proba(prepare_input(basic_input, metadata, scaler))
+
+    rows = basic_input[BASIC_FEATURES].to_numpy(dtype=np.float64)
+    cached = cache.get_many(model_hash, rows)
+    missing = [i for i, proba in enumerate(cached) if proba is None]
+    if missing:
+        computed = model.predict_proba(prepare_input(basic_input.iloc[missing], metadata, scaler))
+        cache.put_many(model_hash, rows[missing], computed)
+        for i, proba in zip(missing, computed):
+            cached[i] = proba
+    return np.vstack(cached)
+
+
+# ========================================
+# RISK LEVELS
+# ========================================
+# Bankruptcy probability above 'high' is HIGH RISK, above 'medium' MEDIUM
+# RISK, anything else LOW RISK. evaluate.py stores the cutoffs in each model's
+# metadata under 'risk_thresholds'; older metadata falls back to the defaults.
+
+DEFAULT_RISK_THRESHOLDS = {'medium': 0.4, 'high': 0.7}
+
+
+def risk_thresholds(metadata):
+    """(medium, high) bankruptcy probability cutoffs for a model"""
+    thresholds = dict(DEFAULT_RISK_THRESHOLDS)
+    if metadata and metadata.get('risk_thresholds'):
+        thresholds.update(metadata['risk_thresholds'])
+    return thresholds['medium'], thresholds['high']
+
+
+def risk_levels(bankruptcy_prob, thresholds=None):
+    """0 = LOW, 1 = MEDIUM, 2 = HIGH for each bankruptcy probability"""
+    medium, high = thresholds or risk_thresholds(None)
+    return np.digitize(bankruptcy_prob, [medium, high], right=True)
+
+
+# ========================================
+# SIDE-BY-SIDE COMPARISON
+# ========================================
+# Models that share the scaler are fed the same prepared matrix (built once
+# per distinct feature list) and run concurrently on a small process-wide
+# thread pool, so the total time is close to the slowest model, not the sum.
+
+COMPARISON_WORKERS = 4
+
+_comparison_pool = None
+_comparison_pool_lock = threading.Lock()
+
+
+def _comparison_executor():
+    global _comparison_pool
+    with _comparison_pool_lock:
+        if _comparison_pool is None:
+            _comparison_pool = ThreadPoolExecutor(max_workers=COMPARISON_WORKERS, thread_name_prefix="compare")
+        return _comparison_pool
+
+
+def _timed_proba(model, X):
+    start = time.perf_counter()
+    proba = model.predict_proba(X)
+    return proba, (time.perf_counter() - start) * 1000
+
+
+def compare_models(named_models, scaler, basic_input):
+    """Score the first input row with several models at once
+
+    named_models is a list of (name, model, metadata). Returns a DataFrame
+    with each model's bankruptcy probability, prediction, risk level and
+    latency; attrs['total_ms'] is the wall time of the whole comparison.
+    """
+    start = time.perf_counter()
+    prepared = {}
+    futures = []
+    for name, model, metadata in named_models:
+        features = tuple(metadata['features']) if metadata and 'features' in metadata else None
+        if features not in prepared:
+            prepared[features] = prepare_input(basic_input.iloc[[0]], metadata, scaler)
+        futures.append(_comparison_executor().submit(_timed_proba, model, prepared[features]))
+
+    rows = []
+    for (name, model, metadata), future in zip(named_models, futures):
+        proba, latency_ms = future.result()
+        rows.append({
+            'model': name,
+            'bankruptcy_prob': float(proba[0, 0]),
+            'prediction': model.classes_[np.argmax(proba[0])],
+            'risk_level': int(risk_levels(proba[:1, 0], risk_thresholds(metadata))[0]),
+            'latency_ms': latency_ms,
+        })
+    comparison = pd.DataFrame(rows)
+    comparison.attrs['total_ms'] = (time.perf_counter() - start) * 1000
+    return comparison
+
+
+# ========================================
+# ONE-FACTOR SENSITIVITY
+# ========================================
+# The base row and every one-notch move of a single factor (up to 12 rows)
+# are scored together in one predict_proba call; rows already in the
+# prediction cache are skipped.
+
+FACTOR_STEP = 0.5
+
+
+def one_factor_changes(basic_input):
+    """Rows that move exactly one factor of the first input row by one notch"""
+    base = basic_input[BASIC_FEATURES].iloc[0].to_numpy(dtype=np.float64)
+    low, high = min(GRID_VALUES), max(GRID_VALUES)
+    rows, changes = [], []
+    for i, factor in enumerate(BASIC_FEATURES):
+        for step in (-FACTOR_STEP, FACTOR_STEP):
+            value = min(max(base[i] + step, low), high)
+            if value == base[i]:
+                continue
+            row = base.copy()
+            row[i] = value
+            rows.append(row)
+            changes.append((factor, step, value))
+    neighbors = pd.DataFrame(np.array(rows).reshape(-1, len(BASIC_FEATURES)), columns=BASIC_FEATURES)
+    return neighbors, pd.DataFrame(changes, columns=['factor', 'step', 'value'])
+
+
+def sensitivity_analysis(model, metadata, scaler, basic_input, cache=None, grid=None):
+    """Base probabilities and the effect of every one-notch factor change
+
+    Returns (base probability row, DataFrame with one row per change and its
+    bankruptcy probability and delta against the base). With a grid (an
+    object with bankruptcy_prob(raw rows), such as dense_grid.DenseGrid) the
+    rows are interpolated from it instead of scored by the model.
+    """
+    neighbors, changes = one_factor_changes(basic_input)
+    if grid is not None:
+        batch = np.vstack([basic_input[BASIC_FEATURES].to_numpy(dtype=np.float64)[:1], neighbors.to_numpy()])
+        bankruptcy_prob = grid.bankruptcy_prob(batch)
+        proba = np.column_stack([bankruptcy_prob, 1.0 - bankruptcy_prob])
+    else:
+        batch = pd.concat([basic_input[BASIC_FEATURES].iloc[[0]], neighbors], ignore_index=True)
+        proba = cached_predict_proba(model, metadata, scaler, batch, cache)
+    changes['bankruptcy_prob'] = proba[1:, 0]
+    changes['delta'] = changes['bankruptcy_prob'] - proba[0, 0]
+    return proba[0], changes
+
+
+# ========================================
+# EXACT SHAPLEY ATTRIBUTIONS
+# ========================================
+# With 6 raw inputs there are only 2^6 = 64 coalitions: every coalition takes
+# the company's value for the factors in it and the baseline value for the
+# rest, and all 64 rows are scored in one predict_proba call. Attributions are
+# per raw input (not per engineered feature) and sum to the difference between
+# the company's and the baseline's bankruptcy probability.
+
+SHAPLEY_BASELINE = {factor: 0.5 for factor in BASIC_FEATURES}
+SHAPLEY_CACHE_SIZE = 1024
+
+_shapley_cache = OrderedDict()
+_shapley_lock = threading.Lock()
+
+
+def coalition_inputs(inputs, baseline):
+    """All 64 mixes of the company's inputs and the baseline (bit i set = factor i from the company)"""
+    n = len(BASIC_FEATURES)
+    masks = np.arange(2 ** n)[:, None] >> np.arange(n)[None, :] & 1
+    company = np.array([inputs[factor] for factor in BASIC_FEATURES], dtype=np.float64)
+    base = np.array([baseline[factor] for factor in BASIC_FEATURES], dtype=np.float64)
+    return pd.DataFrame(np.where(masks == 1, company, base), columns=BASIC_FEATURES)
+
+
+def shapley_from_coalitions(values):
+    """Exact Shapley values from the model output of every coalition (indexed by bitmask)"""
+    n = int(np.log2(len(values)))
+    masks = np.arange(len(values))
+    sizes = np.array([bin(mask).count('1') for mask in masks])
+    weights = np.array([factorial(size) * factorial(n - size - 1) / factorial(n) if size < n else 0.0 for size in sizes])
+    phi = np.empty(n)
+    for i in range(n):
+        without = masks[(masks >> i & 1) == 0]
+        phi[i] = np.sum(weights[without] * (values[without | (1 << i)] - values[without]))
+    return phi
+
+
+def shapley_values(model, metadata, scaler, inputs, baseline=None):
+    """Exact per-input Shapley values for the bankruptcy probability
+
+    Returns (baseline probability, Series of attributions indexed by factor).
+    Results are cached per (model fingerprint, inputs, baseline); models
+    without a registry fingerprint are not cached, since an id() can be
+    reused by another model once the first is evicted.
+    """
+    baseline = baseline or SHAPLEY_BASELINE
+    fingerprint = (metadata or {}).get('fingerprint')
+    key = (fingerprint,
+           tuple(float(inputs[factor]) for factor in BASIC_FEATURES),
+           tuple(float(baseline[factor]) for factor in BASIC_FEATURES))
+    with _shapley_lock:
+        if fingerprint is not None and key in _shapley_cache:
+            _shapley_cache.move_to_end(key)
+            return _shapley_cache[key]
+
+    values = model.predict_proba(prepare_input(coalition_inputs(inputs, baseline), metadata, scaler))[:, 0]
+    result = (float(values[0]), pd.Series(shapley_from_coalitions(values), index=BASIC_FEATURES))
+    if fingerprint is None:
+        return result
+
+    with _shapley_lock:
+        _shapley_cache[key] = result
+        if len(_shapley_cache) > SHAPLEY_CACHE_SIZE:
+            _shapley_cache.popitem(last=False)
+    return result
+
+
+# ========================================
+# RISK SURFACE
+# ========================================
+# All 729 grid inputs are scored in one vectorized pass; 2-factor slices
+# are then cut from the cached array without calling the model again.
+
+def grid_probabilities(model, metadata, scaler):
+    """Bankruptcy probability of every grid input, shaped (3,) * 6 in BASIC_FEATURES order"""
+    proba = model.predict_proba(prepare_input(grid_inputs(), metadata, scaler))[:, 0]
+    return proba.reshape((len(GRID_VALUES),) * len(BASIC_FEATURES))
+
+
+def grid_level(value):
+    """Index of the grid level closest to value"""
+    return int(np.argmin(np.abs(np.asarray(GRID_VALUES) - value)))
+
+
+def surface_slice(surface, x_factor, y_factor, fixed_inputs):
+    """2-D slice (y levels x x levels) with all other factors fixed at fixed_inputs"""
+    index = []
+    for factor in BASIC_FEATURES:
+        if factor in (x_factor, y_factor):
+            index.append(slice(None))
+        else:
+            index.append(grid_level(fixed_inputs[factor]))
+    plane = surface[tuple(index)]
+    # Remaining axes follow BASIC_FEATURES order; put y on rows and x on columns
+    if BASIC_FEATURES.index(x_factor) < BASIC_FEATURES.index(y_factor):
+        plane = plane.T
+    return plane
+
+
+# ========================================
+# COUNTERFACTUAL SEARCH
+# ========================================
+# Cheapest set of one-notch factor moves that brings the bankruptcy
+# probability down to the LOW RISK cutoff, found with a best-first
+# (uniform-cost) search over the precomputed risk surface. Each notch costs
+# the factor's weight, so harder-to-change factors can be made expensive.
+
+LOW_RISK_THRESHOLD = DEFAULT_RISK_THRESHOLDS['medium']
+# Effort per notch before the user changes it in the sidebar
+DEFAULT_EFFORT_WEIGHTS = {factor: 1.0 for factor in BASIC_FEATURES}
+
+
+def wants_counterfactual(bankruptcy_prob, metadata):
+    """Whether the results page looks for a path to Low Risk (the model's Medium cutoff is exceeded)"""
+    return bankruptcy_prob > risk_thresholds(metadata)[0]
+
+
+def counterfactual_search(surface, inputs, threshold=LOW_RISK_THRESHOLD, weights=None):
+    """Cheapest grid cell with bankruptcy probability <= threshold
+
+    Returns None when no cell qualifies, otherwise a dict with the target
+    inputs, the list of (factor, from, to) changes, the total cost and the
+    bankruptcy probability at the target.
+    """
+    weights = weights or {}
+    costs = [float(weights.get(factor, 1.0)) for factor in BASIC_FEATURES]
+    n_levels = len(GRID_VALUES)
+    start = tuple(grid_level(inputs[factor]) for factor in BASIC_FEATURES)
+
+    # Heap entries: (cost, probability, cell) - equal costs prefer the lower risk
+    frontier = [(0.0, float(surface[start]), start)]
+    best_cost = {start: 0.0}
+    while frontier:
+        cost, prob, cell = heapq.heappop(frontier)
+        if cost > best_cost.get(cell, np.inf):
+            continue
+        if prob <= threshold:
+            changes = [(factor, GRID_VALUES[start[i]], GRID_VALUES[cell[i]])
+                       for i, factor in enumerate(BASIC_FEATURES) if cell[i] != start[i]]
+            return {
+                'inputs': {factor: GRID_VALUES[cell[i]] for i, factor in enumerate(BASIC_FEATURES)},
+                'changes': changes,
+                'cost': cost,
+                'bankruptcy_prob': prob,
+            }
+        for i in range(len(BASIC_FEATURES)):
+            for step in (-1, 1):
+                level = cell[i] + step
+                if not 0 <= level < n_levels:
+                    continue
+                neighbor = cell[:i] + (level,) + cell[i + 1:]
+                neighbor_cost = cost + costs[i]
+                if neighbor_cost < best_cost.get(neighbor, np.inf):
+                    best_cost[neighbor] = neighbor_cost
+                    heapq.heappush(frontier, (neighbor_cost, float(surface[neighbor]), neighbor))
+    return None
+
+
+# ========================================
+# ENSEMBLE RUNNER (NATIVE BOOSTER FAST PATH)
+# ========================================
+# VotingClassifier.predict_proba calls every member's sklearn wrapper, and the
+# XGBoost / LightGBM wrappers validate the input and rebuild it on each call,
+# which dominates single-row latency. The runner calls the boosters directly:
+# - XGBoost: Booster.inplace_predict on a float32 copy of the input (the
+#   wrapper does the same call, and XGBoost reads features as float32 anyway)
+# - LightGBM: Booster.predict on the float64 input (LightGBM splits on
+#   doubles, so a float32 buffer could change results)
+# Members can also be swapped for an equivalent drop-in (e.g. the grid KNN
+# index from knn_index.py). Everything else goes through predict_proba as
+# before. The fast path is only enabled when it reproduces the wrapper path
+# bit for bit on a probe set; tests/test_ensemble_runner.py checks the same
+# on the grid and on slider inputs for the pinned library versions.
+
+
+def _xgboost_iteration_range(member):
+    """Trees the wrapper's predict_proba uses: up to best_iteration after early stopping, else all"""
+    if member.get_params().get('booster') == 'gblinear':
+        return (0, 0)
+    try:
+        return (0, member.best_iteration + 1)
+    except AttributeError:
+        return (0, 0)
+
+
+def _xgboost_fast_proba(member):
+    booster = member.get_booster()
+    iteration_range = _xgboost_iteration_range(member)
+
+    def predict_proba(X, X32):
+        p = booster.inplace_predict(X32, iteration_range=iteration_range, predict_type="value", missing=member.missing)
+        return np.vstack((1.0 - p, p)).transpose()
+    return predict_proba
+
+
+def _lightgbm_fast_proba(member):
+    booster = member.booster_
+
+    def predict_proba(X, X32):
+        p = booster.predict(X)
+        return np.vstack((1.0 - p, p)).transpose()
+    return predict_proba
+
+
+def _wrapper_proba(member):
+    def predict_proba(X, X32):
+        return member.predict_proba(X)
+    return predict_proba
+
+
+FAST_PATHS = {
+    'XGBClassifier': _xgboost_fast_proba,
+    'LGBMClassifier': _lightgbm_fast_proba,
+}
+
+
+class EnsembleRunner:
+    """Soft-voting predict / predict_proba with native calls for the boosting members"""
+
+    def __init__(self, model, probe_X=None, member_overrides=None):
+        self.model = model
+        self.classes_ = model.classes_
+        self.fast_members = []
+        self.member_calls = [_wrapper_proba(member) for member in model.estimators_]
+        member_overrides = member_overrides or {}
+        fast_calls = []
+        for name, member in zip(model.named_estimators_.keys(), model.estimators_):
+            fast_path = FAST_PATHS.get(type(member).__name__)
+            if name in member_overrides:
+                fast_calls.append(_wrapper_proba(member_overrides[name]))
+                self.fast_members.append(name)
+            elif fast_path is not None and getattr(member, 'n_classes_', 2) == 2:
+                fast_calls.append(fast_path(member))
+                self.fast_members.append(name)
+            else:
+                fast_calls.append(_wrapper_proba(member))
+        # VotingClassifier's weights skip members set to 'drop', which are not in estimators_
+        self.weights = None if model.weights is None else [
+            weight for (_, estimator), weight in zip(model.estimators, model.weights) if estimator != 'drop']
+        if self.fast_members and (probe_X is None or self._matches_wrapper(fast_calls, probe_X)):
+            self.member_calls = fast_calls
+        else:
+            self.fast_members = []
+
+    def _collect_probas(self, X, member_calls):
+        X = np.asarray(X, dtype=np.float64)
+        X32 = np.ascontiguousarray(X, dtype=np.float32)
+        return np.asarray([call(X, X32) for call in member_calls])
+
+    def _matches_wrapper(self, fast_calls, probe_X):
+        """Fast path must agree bit for bit with the sklearn wrapper path"""
+        fast = self._collect_probas(probe_X, fast_calls)
+        wrapper = np.asarray([member.predict_proba(np.asarray(probe_X, dtype=np.float64))
+                              for member in self.model.estimators_])
+        return fast.dtype == wrapper.dtype and np.array_equal(fast, wrapper)
+
+    def predict_proba(self, X):
+        probas = self._collect_probas(X, self.member_calls)
+        return np.average(probas, axis=0, weights=self.weights)
+
+    def predict(self, X):
+        return self.model.le_.inverse_transform(np.argmax(self.predict_proba(X), axis=1))
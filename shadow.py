@@ -0,0 +1,114 @@
+"""Shadow scoring of a candidate model version on live traffic.
+
+Start the app with BANKRUPTCY_SHADOW_DIR=models/versions/v0003 (any artifact
+directory) and every prediction is also scored by the same model choice from
+that directory - off the request path. The button handler only puts the raw
+inputs and the served result on a bounded queue; a background thread loads
+the candidate on first use, scores each queued batch with one predict_proba
+call per model choice and keeps running agreement and probability-change
+statistics in memory. Served results interpolated from the dense slider grid
+are counted separately, since their probability change includes the
+interpolation error. If the queue is full the request is not shadowed and is
+counted in metrics ("shadow.dropped"), so the served path is never slowed.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from background_writer import BackgroundWriter
+from features import BASIC_FEATURES
+from model_registry import get_models
+from scoring import prepare_input, risk_levels, risk_thresholds
+
+# Absolute change in bankruptcy probability counted as a large change
+LARGE_CHANGE = 0.1
+
+
+class ShadowScorer:
+    """Scores queued requests with a candidate model set and compares with the served results"""
+
+    def __init__(self, candidate_dir, runtime="sklearn", max_queue=1000, flush_interval=0.5, max_batch=256):
+        self.candidate_dir = candidate_dir
+        self.runtime = runtime
+        self.error = None
+        self._candidate = None
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._writer = BackgroundWriter(self._score_batch, "shadow", max_queue, flush_interval, max_batch)
+
+    def submit(self, model, inputs, bankruptcy_prob, prediction, risk_level, source='exact'):
+        """Queue one served prediction; returns False if it was dropped"""
+        if self.error is not None:
+            return False
+        return self._writer.submit((model, [float(inputs[factor]) for factor in BASIC_FEATURES],
+                                    float(bankruptcy_prob), int(prediction), int(risk_level), source))
+
+    def _candidate_models(self):
+        # Loaded by the worker thread so app start-up does not wait for a second model set
+        if self._candidate is None:
+            candidate = get_models(self.candidate_dir, self.runtime)
+            if candidate.error:
+                self.error = candidate.error
+                metrics.increment("shadow.load_errors")
+                raise RuntimeError(f"Could not load shadow models from {self.candidate_dir}")
+            self._candidate = candidate
+        return self._candidate
+
+    def _score_batch(self, records):
+        candidate = self._candidate_models()
+        by_model = {}
+        for record in records:
+            by_model.setdefault(record[0], []).append(record[1:])
+        for model_name, rows in by_model.items():
+            model, metadata = candidate.choice(model_name)
+            if model is None:
+                metrics.increment("shadow.missing_model", len(rows))
+                continue
+            inputs, served_prob, served_prediction, served_level, served_source = zip(*rows)
+            proba = model.predict_proba(prepare_input(pd.DataFrame(list(inputs), columns=BASIC_FEATURES),
+                                                      metadata, candidate.scaler))
+            shadow_prediction = model.classes_[np.argmax(proba, axis=1)]
+            shadow_level = risk_levels(proba[:, 0], risk_thresholds(metadata))
+            delta = proba[:, 0] - np.array(served_prob)
+            self._update(model_name, delta, shadow_prediction == np.array(served_prediction),
+                         shadow_level == np.array(served_level), np.array(served_source) == 'interpolated')
+
+    def _update(self, model_name, delta, same_prediction, same_level, interpolated):
+        with self._lock:
+            stats = self._stats.setdefault(model_name, {
+                'requests': 0, 'interpolated': 0, 'same_prediction': 0, 'same_risk_level': 0,
+                'delta_sum': 0.0, 'abs_delta_sum': 0.0, 'max_abs_delta': 0.0, 'large_changes': 0,
+            })
+            stats['requests'] += len(delta)
+            stats['interpolated'] += int(interpolated.sum())
+            stats['same_prediction'] += int(same_prediction.sum())
+            stats['same_risk_level'] += int(same_level.sum())
+            stats['delta_sum'] += float(delta.sum())
+            stats['abs_delta_sum'] += float(np.abs(delta).sum())
+            stats['max_abs_delta'] = max(stats['max_abs_delta'], float(np.abs(delta).max()))
+            stats['large_changes'] += int((np.abs(delta) > LARGE_CHANGE).sum())
+
+    def report(self):
+        """Agreement and probability-change summary per model choice"""
+        with self._lock:
+            stats = {name: dict(values) for name, values in self._stats.items()}
+        rows = [{
+            'model': name,
+            'requests': values['requests'],
+            'interpolated': values['interpolated'],
+            'prediction_agreement': values['same_prediction'] / values['requests'],
+            'risk_level_agreement': values['same_risk_level'] / values['requests'],
+            'mean_delta': values['delta_sum'] / values['requests'],
+            'mean_abs_delta': values['abs_delta_sum'] / values['requests'],
+            'max_abs_delta': values['max_abs_delta'],
+            'large_changes': values['large_changes'],
+        } for name, values in stats.items()]
+        report = pd.DataFrame(rows, columns=['model', 'requests', 'interpolated', 'prediction_agreement', 'risk_level_agreement',
+                                             'mean_delta', 'mean_abs_delta', 'max_abs_delta', 'large_changes'])
+        report.attrs['dropped'] = metrics.snapshot("shadow.").get("shadow.dropped", 0)
+        return report
+
+    def close(self):
+        self._writer.close()
@@ -0,0 +1,61 @@
+"""Nearest training companies for an input, from a precomputed similarity index.
+
+Distances are euclidean over the scaled engineered features the models see
+(create_features + feature_scaler.pkl), so "similar" means similar to the
+model. The index is built once per model set: the nearest MAX_NEIGHBORS
+companies of every one of the 729 grid inputs are stored in a table, so a
+query from the app's selectboxes is one row lookup. Off-grid inputs are
+prepared and looked up in a KD-tree over the training companies.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+from features import BASIC_FEATURES, DATA_FILE, TARGET_COLUMN, grid_cell_index, grid_inputs
+from scoring import prepare_input
+
+MAX_NEIGHBORS = 10
+
+
+class SimilarityIndex:
+    """Top-k most similar training companies in the models' scaled feature space"""
+
+    def __init__(self, metadata, scaler, data_file=DATA_FILE, max_neighbors=MAX_NEIGHBORS):
+        self.metadata = metadata
+        self.scaler = scaler
+        df = pd.read_csv(data_file)
+        self.companies = df[BASIC_FEATURES].to_numpy(dtype=np.float64)
+        self.outcomes = df[TARGET_COLUMN].astype(int).to_numpy()
+        self.points = prepare_input(df[BASIC_FEATURES], metadata, scaler)
+        self.max_neighbors = min(max_neighbors, len(self.points))
+        self.tree = KDTree(self.points)
+        self.grid_distances, self.grid_neighbors = self._nearest(prepare_input(grid_inputs(), metadata, scaler))
+
+    def _nearest(self, X):
+        """(distances, row indices) of the nearest companies; equal distances in dataset order"""
+        k = self.max_neighbors
+        distances, rows = self.tree.query(X, k=k)
+        # KD-tree order among equal distances is arbitrary; make it deterministic
+        order = np.lexsort((rows, np.round(distances, 12)), axis=1)
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(rows, order, axis=1)
+
+    def query(self, inputs, k=5):
+        """The k nearest training companies to one input (a mapping or Series with the 6 raw factors)
+
+        Returns a DataFrame with each company's row in the dataset, its 6
+        factors, its actual outcome (class_yn, 0 = bankruptcy) and distance.
+        """
+        k = min(k, self.max_neighbors)
+        raw = np.array([[float(inputs[factor]) for factor in BASIC_FEATURES]])
+        cells, on_grid = grid_cell_index(raw)
+        if on_grid[0]:
+            distances, rows = self.grid_distances[cells[0], :k], self.grid_neighbors[cells[0], :k]
+        else:
+            distances, rows = self._nearest(prepare_input(pd.DataFrame(raw, columns=BASIC_FEATURES),
+                                                          self.metadata, self.scaler))
+            distances, rows = distances[0, :k], rows[0, :k]
+        columns = {'row': rows}
+        columns.update(zip(BASIC_FEATURES, self.companies[rows].T))
+        columns[TARGET_COLUMN] = self.outcomes[rows]
+        columns['distance'] = distances
+        return pd.DataFrame(columns)
@@ -0,0 +1,37 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The tools resolve models/ and the dataset relative to the project root
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(PROJECT_DIR)
+
+from artifacts import MODELS_DIR  # noqa: E402
+from features import BASIC_FEATURES, grid_inputs  # noqa: E402
+from model_registry import get_models  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def models():
+    """The shipped model set (sklearn runtime)"""
+    loaded = get_models(MODELS_DIR)
+    if loaded.error:
+        pytest.skip(f"Models could not be loaded:\n{loaded.error}")
+    return loaded
+
+
+@pytest.fixture(scope='session')
+def grid_frame():
+    """All 729 Low / Medium / High input combinations"""
+    return grid_inputs()
+
+
+@pytest.fixture(scope='session')
+def slider_frame():
+    """300 inputs on the app's 0.05 slider steps, each off the 0/0.5/1 grid in at least one factor"""
+    rng = np.random.default_rng(0)
+    raw = rng.integers(0, 21, size=(300, len(BASIC_FEATURES))) * 0.05
+    raw[:, 0] = np.where(np.isin(np.round(raw[:, 0], 2), [0.0, 0.5, 1.0]), 0.35, raw[:, 0])
+    return pd.DataFrame(raw, columns=BASIC_FEATURES)
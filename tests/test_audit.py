@@ -0,0 +1,79 @@
+import glob
+import time
+
+import numpy as np
+import pytest
+
+from audit import AUDIT_MODELS, AuditLog, read_audit_log
+from features import BASIC_FEATURES
+
+
+def company(i):
+    return {factor: (i + position) % 3 * 0.5 for position, factor in enumerate(BASIC_FEATURES)}
+
+
+def audit_files(directory):
+    return sorted(glob.glob(str(directory / "audit-*.bin")))
+
+
+def wait_for_files(directory, count, timeout=5.0):
+    deadline = time.time() + timeout
+    while len(audit_files(directory)) < count and time.time() < deadline:
+        time.sleep(0.01)
+    return len(audit_files(directory))
+
+
+def test_records_read_back(tmp_path):
+    log = AuditLog(str(tmp_path), fsync=False)
+    for i in range(5):
+        log.record(f"session{i}", AUDIT_MODELS[i % len(AUDIT_MODELS)], "abc123", company(i), i / 10, i % 2, 1.5 + i)
+    log.close()
+
+    records = read_audit_log(str(tmp_path))
+    assert len(records) == 5
+    assert list(records['session']) == [f"session{i}" for i in range(5)]
+    assert list(records['model']) == [AUDIT_MODELS[i % len(AUDIT_MODELS)] for i in range(5)]
+    assert (records['fingerprint'] == "abc123").all()
+    np.testing.assert_array_equal(records[BASIC_FEATURES].to_numpy(),
+                                  [[company(i)[factor] for factor in BASIC_FEATURES] for i in range(5)])
+    np.testing.assert_array_equal(records['bankruptcy_prob'], [i / 10 for i in range(5)])
+    assert list(records['prediction']) == [i % 2 for i in range(5)]
+    np.testing.assert_allclose(records['latency_ms'], [1.5 + i for i in range(5)])
+    assert (records['source'] == 'exact').all()
+
+
+def test_records_interpolated_source(tmp_path):
+    log = AuditLog(str(tmp_path), fsync=False)
+    log.record("s", AUDIT_MODELS[0], "abc123", company(0), 0.3, 1, 1.0, source='interpolated')
+    log.record("s", AUDIT_MODELS[0], "abc123", company(1), 0.4, 1, 1.0)
+    log.close()
+    assert list(read_audit_log(str(tmp_path))['source']) == ['interpolated', 'exact']
+
+
+@pytest.mark.parametrize('limits', [{'max_bytes': 1}, {'max_age_seconds': 0}])
+def test_rotates_by_size_and_age(tmp_path, limits):
+    log = AuditLog(str(tmp_path), fsync=False, **limits)
+    for i in range(3):
+        log.record("s", AUDIT_MODELS[0], "abc123", company(i), i / 10, 0, 1.0)
+        assert wait_for_files(tmp_path, i + 1) == i + 1
+    log.close()
+
+    records = read_audit_log(str(tmp_path))
+    assert records['file'].nunique() == 3
+    np.testing.assert_array_equal(records['bankruptcy_prob'], [0.0, 0.1, 0.2])
+
+
+def test_ignores_partial_last_record(tmp_path):
+    log = AuditLog(str(tmp_path), fsync=False)
+    for i in range(2):
+        log.record("s", AUDIT_MODELS[0], "abc123", company(i), i / 10, 0, 1.0)
+    log.close()
+    with open(audit_files(tmp_path)[0], 'ab') as file:
+        file.write(b"\x00" * 7)
+    assert len(read_audit_log(str(tmp_path))) == 2
+
+
+def test_empty_directory(tmp_path):
+    records = read_audit_log(str(tmp_path))
+    assert len(records) == 0
+    assert set(BASIC_FEATURES) <= set(records.columns)
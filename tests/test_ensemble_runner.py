@@ -0,0 +1,38 @@
+import os
+
+import numpy as np
+import pytest
+
+from artifacts import MODELS_DIR, load_pickle_or_joblib
+from scoring import EnsembleRunner, prepare_input
+
+
+@pytest.fixture(scope='module')
+def voting_classifier():
+    return load_pickle_or_joblib(os.path.join(MODELS_DIR, "ensemble_model.pkl"))
+
+
+@pytest.fixture(scope='module')
+def prepare(models):
+    return lambda inputs: prepare_input(inputs, models.ensemble_metadata, models.scaler)
+
+
+def test_boosters_use_the_native_path(voting_classifier, prepare, grid_frame):
+    runner = EnsembleRunner(voting_classifier, probe_X=prepare(grid_frame))
+    assert {'xgboost', 'lightgbm'} <= set(runner.fast_members)
+
+
+@pytest.mark.parametrize('inputs', ['grid_frame', 'slider_frame'])
+def test_fast_path_is_bit_for_bit_equal(voting_classifier, prepare, inputs, request):
+    X = prepare(request.getfixturevalue(inputs))
+    # No probe: the native calls are used unconditionally
+    runner = EnsembleRunner(voting_classifier)
+    assert np.array_equal(runner.predict_proba(X), voting_classifier.predict_proba(X))
+    assert np.array_equal(runner.predict(X), voting_classifier.predict(X))
+
+
+def test_single_rows_are_bit_for_bit_equal(voting_classifier, prepare, slider_frame):
+    runner = EnsembleRunner(voting_classifier)
+    for i in range(20):
+        X = prepare(slider_frame.iloc[[i]])
+        assert np.array_equal(runner.predict_proba(X), voting_classifier.predict_proba(X))
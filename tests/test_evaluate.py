@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from artifacts import MODELS_DIR
+from evaluate import derive_risk_thresholds, evaluate
+from scoring import DEFAULT_RISK_THRESHOLDS
+
+
+def test_report_keeps_the_shipped_cutoffs(models):
+    results = evaluate(MODELS_DIR, write=False)
+    assert results
+    for performance, evaluation, thresholds in results.values():
+        assert thresholds is None
+        assert 'risk_band_targets' not in evaluation
+    for _, metadata in (models.choice(name) for name in results):
+        assert metadata.get('risk_thresholds') in (None, DEFAULT_RISK_THRESHOLDS)
+
+
+def test_recalibration_needs_enough_bankruptcies(models):
+    with pytest.raises(SystemExit, match="needs at least 50"):
+        evaluate(MODELS_DIR, write=False, recalibrate=True)
+
+
+def test_derived_cutoffs_meet_the_targets():
+    rng = np.random.default_rng(0)
+    y = (rng.random(2000) > 0.3).astype(int)
+    bankruptcy_prob = np.clip(np.where(y == 0, 0.7, 0.2) + rng.normal(0, 0.15, len(y)), 0, 1)
+    (medium, high), achieved = derive_risk_thresholds(y, bankruptcy_prob, 0.95, 0.9)
+    assert medium < high
+    assert achieved['medium_recall'] >= 0.95
+    assert achieved['high_precision'] >= 0.9
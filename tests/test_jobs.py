@@ -0,0 +1,125 @@
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import jobs
+from artifacts import MODELS_DIR, load_pickle_or_joblib
+from features import BASIC_FEATURES
+from jobs import JobQueue
+from scoring import prepare_input
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    """200 companies on slider steps with an extra column that must be kept"""
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame(rng.integers(0, 21, size=(200, len(BASIC_FEATURES))) * 0.05, columns=BASIC_FEATURES)
+    frame.insert(0, 'company', [f"c{i}" for i in range(200)])
+    path = tmp_path / "companies.csv"
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    job_queue = JobQueue(str(tmp_path / "jobs"), workers=1, resume=False)
+    yield job_queue
+    job_queue.close()
+
+
+def run(queue, input_file, models_dir=MODELS_DIR, **kwargs):
+    job_id = queue.submit(input_file, 'ensemble', models_dir, chunk_rows=50, start=False, **kwargs)
+    return job_id, queue.run_job(job_id)
+
+
+def read_output(queue, job_id):
+    with open(queue.output_path(job_id), 'rb') as file:
+        return file.read()
+
+
+def test_job_scores_every_row(models, queue, input_file):
+    job_id, state = run(queue, input_file)
+    assert (state['status'], state['rows_done'], state['chunks_done']) == ('done', 200, 4)
+    assert not os.path.exists(os.path.join(queue.directory, job_id, "lock"))
+
+    output = pd.read_csv(queue.output_path(job_id))
+    assert list(output['company']) == [f"c{i}" for i in range(200)]
+    model, metadata = models.choice('ensemble')
+    expected = model.predict_proba(prepare_input(pd.read_csv(input_file)[BASIC_FEATURES], metadata, models.scaler))
+    np.testing.assert_allclose(output['bankruptcy_prob'], expected[:, 0], rtol=0, atol=1e-12)
+
+
+def test_resume_after_crash_gives_identical_output(queue, input_file, monkeypatch):
+    clean_id, _ = run(queue, input_file)
+
+    # Die while scoring the third chunk, after a partial write
+    score_chunk = jobs.score_chunk
+    calls = []
+
+    def crashing_score_chunk(chunk, *args):
+        calls.append(len(chunk))
+        if len(calls) == 3:
+            with open(queue.output_path(job_id), 'ab') as output:
+                output.write(b"c100,0.5,0.5,half a ro")
+            raise KeyboardInterrupt
+        return score_chunk(chunk, *args)
+
+    monkeypatch.setattr(jobs, 'score_chunk', crashing_score_chunk)
+    job_id = queue.submit(input_file, 'ensemble', MODELS_DIR, chunk_rows=50, start=False)
+    with pytest.raises(KeyboardInterrupt):
+        queue.run_job(job_id)
+    assert (queue.status(job_id)['status'], queue.status(job_id)['chunks_done']) == ('running', 2)
+
+    monkeypatch.setattr(jobs, 'score_chunk', score_chunk)
+    state = queue.run_job(job_id)
+    assert (state['status'], state['rows_done']) == ('done', 200)
+    assert read_output(queue, job_id) == read_output(queue, clean_id)
+
+
+def test_fails_when_model_files_change_between_chunks(queue, input_file, tmp_path, monkeypatch):
+    models_dir = tmp_path / "models"
+    shutil.copytree(MODELS_DIR, models_dir)
+    score_chunk = jobs.score_chunk
+
+    def retraining_score_chunk(chunk, *args):
+        # Same scaler, different file contents - as after a retrain in place
+        scaler_file = str(models_dir / "feature_scaler.pkl")
+        joblib.dump(load_pickle_or_joblib(scaler_file), scaler_file, compress=3)
+        return score_chunk(chunk, *args)
+
+    monkeypatch.setattr(jobs, 'score_chunk', retraining_score_chunk)
+    _, state = run(queue, input_file, str(models_dir))
+    assert state['status'] == 'failed'
+    assert "Model files changed" in state['error']
+    assert state['chunks_done'] == 1
+
+
+def test_cancel_stops_before_next_chunk(queue, input_file):
+    job_id = queue.submit(input_file, 'ensemble', MODELS_DIR, chunk_rows=50, start=False)
+    queue.cancel(job_id)
+    state = queue.run_job(job_id)
+    assert (state['status'], state['rows_done']) == ('cancelled', 0)
+    assert not os.path.exists(os.path.join(queue.directory, job_id, "lock"))
+
+
+def test_invalid_rows_fail_the_job(queue, input_file, tmp_path):
+    frame = pd.read_csv(input_file)
+    frame.loc[120, 'credibility'] = 1.5
+    bad_file = str(tmp_path / "bad.csv")
+    frame.to_csv(bad_file, index=False)
+    _, state = run(queue, bad_file)
+    assert state['status'] == 'failed'
+    assert "data row 121" in state['error']
+    assert state['rows_done'] == 100
+
+
+def test_missing_columns_are_refused(queue, tmp_path):
+    path = tmp_path / "partial.csv"
+    pd.DataFrame({'credibility': [0.5]}).to_csv(path, index=False)
+    with pytest.raises(ValueError, match="missing columns"):
+        queue.submit(str(path), start=False)
+    assert os.listdir(queue.directory) == []
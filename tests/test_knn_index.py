@@ -0,0 +1,39 @@
+import shutil
+
+import joblib
+import numpy as np
+import pytest
+
+from artifacts import MODELS_DIR, load_pickle_or_joblib
+from knn_index import KNN_INDEX_FILE, GridKNN, build_knn_index
+from model_registry import load_model_set
+from scoring import prepare_input
+
+
+@pytest.fixture(scope='module')
+def indexes():
+    return build_knn_index(MODELS_DIR)
+
+
+@pytest.mark.parametrize('inputs', ['grid_frame', 'slider_frame'])
+def test_index_matches_original_knn(models, indexes, inputs, request):
+    X = prepare_input(request.getfixturevalue(inputs), models.best_model_metadata, models.scaler)
+    for knn, index in indexes.values():
+        np.testing.assert_array_equal(index.predict_proba(X), knn.predict_proba(X))
+        np.testing.assert_array_equal(index.predict(X), knn.predict(X))
+
+
+def test_registry_uses_shipped_index(models):
+    assert isinstance(models.best_model, GridKNN)
+
+
+def test_registry_ignores_stale_index(tmp_path):
+    shutil.copytree(MODELS_DIR, tmp_path / "models")
+    models_dir = tmp_path / "models"
+    # Same scaler, different file contents - as after a retrain or update
+    joblib.dump(load_pickle_or_joblib(str(models_dir / "feature_scaler.pkl")),
+                str(models_dir / "feature_scaler.pkl"), compress=3)
+    assert (models_dir / KNN_INDEX_FILE).exists()
+    models = load_model_set(str(models_dir))
+    assert models.error is None
+    assert not isinstance(models.best_model, GridKNN)
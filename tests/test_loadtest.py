@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+import loadtest
+from features import BASIC_FEATURES
+from scoring import DEFAULT_EFFORT_WEIGHTS
+
+# Default Medium input (2.7% with the ensemble) and a clearly risky one
+INPUTS = {
+    'medium': {factor: 0.5 for factor in BASIC_FEATURES},
+    'risky': {'industrial_risk': 1.0, 'management_risk': 1.0, 'financial_flexibility': 0.0,
+              'credibility': 0.0, 'competitiveness': 0.0, 'operating_risk': 1.0},
+}
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    """Arguments of every counterfactual search the load test runs"""
+    calls = []
+    monkeypatch.setattr(loadtest, 'counterfactual_search',
+                        lambda surface, inputs, threshold, weights: calls.append((threshold, weights)))
+    return calls
+
+
+def test_uses_model_cutoff_and_app_weights(models, searches):
+    score = loadtest.ScoringPath('ensemble')
+    score.metadata = {**score.metadata, 'risk_thresholds': {'medium': 0.01, 'high': 0.02}}
+    score(pd.DataFrame([INPUTS['medium']]))
+    assert searches == [(0.01, DEFAULT_EFFORT_WEIGHTS)]
+
+
+@pytest.mark.parametrize('name', list(INPUTS))
+def test_same_branch_as_app(models, searches, monkeypatch, name):
+    streamlit_testing = pytest.importorskip('streamlit.testing.v1')
+    monkeypatch.setenv('BANKRUPTCY_AUDIT_DIR', '')
+    monkeypatch.setenv('BANKRUPTCY_PREDICTION_CACHE', '')
+
+    at = streamlit_testing.AppTest.from_file('prediction.py', default_timeout=120)
+    at.run()
+    options = {0.0: '0.0 - Low', 0.5: '0.5 - Medium', 1.0: '1.0 - High'}
+    for selectbox in at.main.selectbox:
+        factor = selectbox.label.split(' ', 1)[-1].lower().replace(' ', '_')
+        if factor in INPUTS[name]:
+            selectbox.select(options[INPUTS[name][factor]])
+    at.run()
+    at.button[0].click().run()  # the sidebar defaults to the ensemble
+    assert not at.exception
+    app_searched = any('Fastest Path' in markdown.value for markdown in at.markdown)
+
+    loadtest.ScoringPath('ensemble')(pd.DataFrame([INPUTS[name]]))
+    assert bool(searches) == app_searched == (name == 'risky')
@@ -0,0 +1,19 @@
+import shutil
+
+import joblib
+
+from artifacts import MODELS_DIR, load_pickle_or_joblib
+from model_registry import load_model_set
+
+
+def test_student_fingerprint_covers_teacher(tmp_path):
+    shutil.copytree(MODELS_DIR, tmp_path / "models")
+    models_dir = tmp_path / "models"
+    before = load_model_set(str(models_dir)).student_metadata['fingerprint']
+    # Same ensemble, different file contents - as after a retrain of the teacher only
+    joblib.dump(load_pickle_or_joblib(str(models_dir / "ensemble_model.pkl")),
+                str(models_dir / "ensemble_model.pkl"), compress=3)
+    models = load_model_set(str(models_dir))
+    assert models.error is None
+    assert str(models_dir / "ensemble_model.pkl") in models.student_metadata['fingerprint_files']
+    assert models.student_metadata['fingerprint'] != before
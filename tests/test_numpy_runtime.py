@@ -0,0 +1,79 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pytest
+
+from artifacts import MODELS_DIR, load_pickle_or_joblib
+from export_numpy import EXPORT_TOLERANCE, export_ensemble, export_fingerprint
+from model_registry import load_model_set
+from numpy_runtime import NUMPY_ENSEMBLE_FILE, NumpyEnsemble
+from scoring import prepare_input
+
+
+@pytest.fixture
+def exported_dir(tmp_path):
+    """A models folder holding the shipped ensemble and scaler plus a fresh NumPy export"""
+    for name in ("ensemble_model.pkl", "feature_scaler.pkl"):
+        shutil.copy(os.path.join(MODELS_DIR, name), tmp_path / name)
+    ensemble_model = load_pickle_or_joblib(str(tmp_path / "ensemble_model.pkl"))
+    scaler = load_pickle_or_joblib(str(tmp_path / "feature_scaler.pkl"))
+    export_ensemble(ensemble_model, scaler, str(tmp_path / NUMPY_ENSEMBLE_FILE), export_fingerprint(str(tmp_path)))
+    return tmp_path
+
+
+@pytest.mark.parametrize('inputs', ['grid_frame', 'slider_frame'])
+def test_export_matches_voting_classifier(exported_dir, inputs, request):
+    ensemble_model = load_pickle_or_joblib(str(exported_dir / "ensemble_model.pkl"))
+    scaler = load_pickle_or_joblib(str(exported_dir / "feature_scaler.pkl"))
+    X = prepare_input(request.getfixturevalue(inputs), {'features': list(scaler.feature_names_in_)}, scaler)
+    exported = NumpyEnsemble.load(str(exported_dir / NUMPY_ENSEMBLE_FILE))
+    np.testing.assert_allclose(exported.predict_proba(X), ensemble_model.predict_proba(X), rtol=0, atol=EXPORT_TOLERANCE)
+
+
+def test_registry_serves_matching_export(exported_dir):
+    models = load_model_set(str(exported_dir), runtime="numpy")
+    assert models.error is None
+    assert isinstance(models.ensemble_model, NumpyEnsemble)
+
+
+def test_registry_refuses_stale_export(exported_dir):
+    # Same model, different file contents - as after a retrain or update
+    joblib.dump(load_pickle_or_joblib(str(exported_dir / "ensemble_model.pkl")),
+                str(exported_dir / "ensemble_model.pkl"), compress=3)
+    models = load_model_set(str(exported_dir), runtime="numpy")
+    assert models.ensemble_model is None
+    assert "export_numpy.py" in models.error
+
+
+# Loads the numpy runtime in a fresh interpreter where importing these fails
+WITHOUT_SKLEARN = """
+import sys
+for name in ('sklearn', 'xgboost', 'lightgbm'):
+    sys.modules[name] = None
+import numpy as np
+from features import grid_inputs
+from model_registry import load_model_set
+from scoring import prepare_input
+models = load_model_set(sys.argv[1], runtime='numpy')
+assert models.error is None, models.error
+assert models.best_model is None
+X = prepare_input(grid_inputs(), {'features': sys.argv[3].split(',')}, models.scaler)
+np.save(sys.argv[2], models.ensemble_model.predict_proba(X))
+"""
+
+
+def test_numpy_runtime_without_sklearn(exported_dir, grid_frame):
+    shutil.copy(os.path.join(MODELS_DIR, "best_model_knn.pkl"), exported_dir / "best_model_knn.pkl")
+    scaler = load_pickle_or_joblib(str(exported_dir / "feature_scaler.pkl"))
+    features = list(scaler.feature_names_in_)
+    output = exported_dir / "proba.npy"
+    subprocess.run([sys.executable, "-c", WITHOUT_SKLEARN, str(exported_dir), str(output), ",".join(features)],
+                   check=True)
+
+    ensemble_model = load_pickle_or_joblib(str(exported_dir / "ensemble_model.pkl"))
+    X = prepare_input(grid_frame, {'features': features}, scaler)
+    np.testing.assert_allclose(np.load(output), ensemble_model.predict_proba(X), rtol=0, atol=EXPORT_TOLERANCE)
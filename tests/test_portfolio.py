@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import BASIC_FEATURES
+from portfolio import ID_COLUMN, read_portfolio, rescore_portfolio
+
+
+class CountingModel:
+    """Wraps a model and records how many rows each predict_proba call scores"""
+
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = model.classes_
+        self.calls = []
+
+    def predict_proba(self, X):
+        self.calls.append(len(X))
+        return self.model.predict_proba(X)
+
+
+def make_portfolio(tmp_path, raw, ids, name="portfolio.csv"):
+    frame = pd.DataFrame(raw, columns=BASIC_FEATURES)
+    frame.insert(0, ID_COLUMN, ids)
+    path = tmp_path / name
+    frame.to_csv(path, index=False)
+    return read_portfolio(str(path))
+
+
+@pytest.fixture
+def portfolios(tmp_path):
+    """Yesterday's 200 companies and today's: 10 changed, 5 removed, 5 new"""
+    rng = np.random.default_rng(7)
+    raw = rng.integers(0, 21, size=(200, len(BASIC_FEATURES))) * 0.05
+    ids = [f"c{i:03d}" for i in range(200)]
+    before = make_portfolio(tmp_path, raw, ids, "before.csv")
+
+    today = raw.copy()
+    today[:10, 0] = 1.0 - today[:10, 0] + np.where(today[:10, 0] == 0.5, 0.05, 0.0)
+    new_raw = rng.integers(0, 21, size=(5, len(BASIC_FEATURES))) * 0.05
+    after = make_portfolio(tmp_path, np.vstack([today[:195], new_raw]),
+                           ids[:195] + [f"n{i}" for i in range(5)], "after.csv")
+    return before, after
+
+
+def test_incremental_matches_full_rescore(models, portfolios):
+    before, after = portfolios
+    model, metadata = models.choice('ensemble')
+    previous = rescore_portfolio(before, None, model, metadata, models.scaler)
+    results, summary = rescore_portfolio(after, previous, model, metadata, models.scaler)
+    full_results, full_summary = rescore_portfolio(after, None, model, metadata, models.scaler)
+
+    np.testing.assert_array_equal(results['bankruptcy_prob'], full_results['bankruptcy_prob'])
+    np.testing.assert_array_equal(results['risk_level'], full_results['risk_level'])
+    assert summary['level_counts'] == full_summary['level_counts']
+    assert summary['histogram'] == full_summary['histogram']
+    assert summary['probability_sum'] == pytest.approx(full_summary['probability_sum'], abs=1e-9)
+    assert not summary['full_rescore'] and full_summary['full_rescore']
+
+
+def test_only_changed_companies_are_scored(models, portfolios):
+    before, after = portfolios
+    model, metadata = models.choice('ensemble')
+    counting = CountingModel(model)
+    previous = rescore_portfolio(before, None, counting, metadata, models.scaler)
+    results, summary = rescore_portfolio(after, previous, counting, metadata, models.scaler)
+
+    assert counting.calls == [200, 15]
+    assert (summary['new'], summary['changed'], summary['removed'], summary['rescored']) == (5, 10, 5, 15)
+    assert (results.loc[[f"c{i:03d}" for i in range(10)], 'previous_level'] >= 0).all()
+    assert (results.loc[[f"n{i}" for i in range(5)], 'previous_level'] == -1).all()
+
+
+def test_unchanged_portfolio_scores_nothing(models, portfolios):
+    before, _ = portfolios
+    model, metadata = models.choice('ensemble')
+    counting = CountingModel(model)
+    previous = rescore_portfolio(before, None, counting, metadata, models.scaler)
+    _, summary = rescore_portfolio(before, previous, counting, metadata, models.scaler)
+    assert counting.calls == [200]
+    assert summary['rescored'] == 0 and summary['level_counts'] == previous[1]['level_counts']
+
+
+def test_new_model_files_rescore_everything(models, portfolios):
+    before, after = portfolios
+    model, metadata = models.choice('ensemble')
+    previous = rescore_portfolio(before, None, model, metadata, models.scaler)
+    counting = CountingModel(model)
+    _, summary = rescore_portfolio(after, previous, counting, dict(metadata, fingerprint="retrained"), models.scaler)
+    assert summary['full_rescore'] and counting.calls == [200]
@@ -0,0 +1,40 @@
+import sqlite3
+
+import numpy as np
+
+import prediction_cache
+from prediction_cache import PredictionCache
+
+
+def test_keeps_newest_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(prediction_cache, 'PRUNE_INTERVAL', 10)
+    cache = PredictionCache(str(tmp_path / "cache.sqlite"), memory_size=0, max_rows=25)
+    rows = np.arange(60 * 6, dtype=np.float64).reshape(60, 6)
+    for start in range(0, 60, 5):
+        cache.put_many("model", rows[start:start + 5], np.ones((5, 2)))
+    assert len(cache) <= 25 + 10
+
+    cache.prune()
+    assert len(cache) == 25
+    results = cache.get_many("model", rows)
+    assert all(result is None for result in results[:35])
+    assert all(result is not None for result in results[35:])
+
+
+def test_rewritten_entry_counts_as_new(tmp_path):
+    cache = PredictionCache(str(tmp_path / "cache.sqlite"), memory_size=0, max_rows=2)
+    rows = np.eye(3, 6)
+    cache.put_many("model", rows, np.ones((3, 2)))
+    cache.put_many("model", rows[:1], np.ones((1, 2)))
+    cache.prune()
+    assert [result is not None for result in cache.get_many("model", rows)] == [True, False, True]
+
+
+def test_replaces_table_without_rowid(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE predictions (model TEXT NOT NULL, inputs BLOB NOT NULL, "
+                           "proba BLOB NOT NULL, PRIMARY KEY (model, inputs)) WITHOUT ROWID")
+    cache = PredictionCache(path, max_rows=10)
+    cache.put_many("model", np.zeros((1, 6)), np.ones((1, 2)))
+    assert len(cache) == 1
@@ -0,0 +1,18 @@
+import shutil
+
+from artifacts import MODELS_DIR
+from replay import replay, summarize
+
+
+def test_skips_records_of_unavailable_models(tmp_path):
+    shutil.copytree(MODELS_DIR, tmp_path / "models")
+    (tmp_path / "models" / "student_model.pkl").write_bytes(b"not a pickle")
+    records = [{'ts': 0.0, 'model': name, 'inputs': [0.5] * 6, 'bankruptcy_prob': 0.03, 'prediction': 1}
+               for name in ('ensemble', 'student', 'ensemble')]
+
+    results = replay(records, str(tmp_path / "models"))
+    assert results.attrs['load_error']
+    assert list(results['model']) == ['ensemble', 'ensemble']
+    summary = summarize(results)
+    assert summary['requests'] == 2
+    assert summary['model_unavailable'] == 1
@@ -0,0 +1,24 @@
+import numpy as np
+
+from features import BASIC_FEATURES
+from scoring import shapley_values
+
+
+class ConstantModel:
+    """Stand-in model that gives every row the same bankruptcy probability"""
+
+    def __init__(self, bankruptcy_prob):
+        self.bankruptcy_prob = bankruptcy_prob
+
+    def predict_proba(self, X):
+        return np.tile([self.bankruptcy_prob, 1.0 - self.bankruptcy_prob], (len(X), 1))
+
+
+def test_shapley_cache_needs_fingerprint():
+    inputs = {factor: 1.0 for factor in BASIC_FEATURES}
+    # Without a fingerprint nothing is cached, so a new model never gets an old model's result
+    assert shapley_values(ConstantModel(0.2), None, None, inputs)[0] == 0.2
+    assert shapley_values(ConstantModel(0.6), None, None, inputs)[0] == 0.6
+    # With one, the second call is served from the cache
+    assert shapley_values(ConstantModel(0.2), {'fingerprint': "abc"}, None, inputs)[0] == 0.2
+    assert shapley_values(ConstantModel(0.6), {'fingerprint': "abc"}, None, inputs)[0] == 0.2
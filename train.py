@@ -0,0 +1,479 @@
+"""Training pipeline for the bankruptcy models.
+
+Usage:
+    python train.py                 # retrain with the default member configs
+    python train.py --search        # successive-halving search, then retrain
+    python train.py --output-dir out/ --cache-file out/search_cache.pkl
+    python train.py --update new_companies.csv   # append new labeled rows
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMClassifier
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, cross_val_score, train_test_split
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+from xgboost import XGBClassifier
+
+from artifacts import (MODELS_DIR, TRAINING_ROWS_FILE, clear_latest, fingerprint_files, latest_models_dir,
+                       load_pickle_or_joblib, next_version_dir, publish_version)
+from features import BASIC_FEATURES, DATA_FILE, TARGET_COLUMN, create_features, load_training_data
+
+SEARCH_CACHE_FILE = os.path.join(MODELS_DIR, "search_cache.pkl")
+RANDOM_STATE = 42
+
+# ========================================
+# ENSEMBLE MEMBERS
+# ========================================
+# Default configs match the shipped ensemble_model.pkl
+
+DEFAULT_PARAMS = {
+    'logistic_regression': {'max_iter': 1000},
+    'knn': {'n_neighbors': 5},
+    'random_forest': {'n_estimators': 100},
+    'decision_tree': {'max_depth': 4, 'min_samples_leaf': 2, 'min_samples_split': 5},
+    'svm': {'C': 1.0, 'gamma': 'scale', 'class_weight': 'balanced'},
+    'lightgbm': {'n_estimators': 100, 'learning_rate': 0.1, 'num_leaves': 31,
+                 'subsample': 0.8, 'colsample_bytree': 0.8, 'reg_alpha': 0.1, 'reg_lambda': 0.1},
+    'xgboost': {'n_estimators': 100, 'learning_rate': 0.1, 'max_depth': 6,
+                'subsample': 0.8, 'colsample_bytree': 0.8, 'reg_alpha': 0.1, 'reg_lambda': 0.1},
+}
+
+
+def build_member(name, params):
+    """Create an unfitted ensemble member with the given hyperparameters"""
+    if name == 'logistic_regression':
+        return LogisticRegression(random_state=RANDOM_STATE, **params)
+    if name == 'knn':
+        return KNeighborsClassifier(**params)
+    if name == 'random_forest':
+        return RandomForestClassifier(random_state=RANDOM_STATE, **params)
+    if name == 'decision_tree':
+        return DecisionTreeClassifier(random_state=RANDOM_STATE, **params)
+    if name == 'svm':
+        return SVC(probability=True, random_state=RANDOM_STATE, **params)
+    if name == 'lightgbm':
+        return LGBMClassifier(random_state=RANDOM_STATE, verbose=-1, **params)
+    if name == 'xgboost':
+        return XGBClassifier(random_state=RANDOM_STATE, eval_metric='logloss', verbosity=0, **params)
+    raise ValueError(f"Unknown ensemble member: {name}")
+
+
+def build_ensemble(member_params):
+    """Soft-voting ensemble over all 7 members"""
+    estimators = [(name, build_member(name, params)) for name, params in member_params.items()]
+    return VotingClassifier(estimators=estimators, voting='soft')
+
+
+# ========================================
+# SUCCESSIVE-HALVING SEARCH
+# ========================================
+# Each rung trains every surviving candidate on a fraction of the budget
+# (fewer trees and fewer rows), keeps the best 1/ETA and moves up a rung.
+# Scores are cached on disk by (member, params, budget, data hash) where the
+# data hash covers only the rows used at that rung, so a rerun after a small
+# data change re-evaluates only the rungs whose rows actually changed.
+
+SEARCH_SPACES = {
+    'xgboost': {
+        'n_estimators': [100, 200, 400],
+        'learning_rate': [0.05, 0.1, 0.2],
+        'max_depth': [3, 4, 6],
+        'subsample': [0.8],
+        'colsample_bytree': [0.8],
+        'reg_alpha': [0.1],
+        'reg_lambda': [0.1, 1.0],
+    },
+    'lightgbm': {
+        'n_estimators': [100, 200, 400],
+        'learning_rate': [0.05, 0.1, 0.2],
+        'num_leaves': [7, 15, 31],
+        'min_child_samples': [5, 10, 20],
+        'subsample': [0.8],
+        'colsample_bytree': [0.8],
+        'reg_alpha': [0.1],
+        'reg_lambda': [0.1],
+    },
+    'random_forest': {
+        'n_estimators': [100, 200, 400],
+        'max_depth': [None, 4, 8],
+        'min_samples_leaf': [1, 2, 4],
+        'max_features': ['sqrt', 0.5],
+    },
+    'svm': {
+        'C': [0.1, 0.3, 1.0, 3.0, 10.0],
+        'gamma': ['scale', 0.01, 0.1, 1.0],
+        'class_weight': ['balanced', None],
+    },
+}
+
+# Members whose budget also scales the number of trees
+TREE_MEMBERS = {'xgboost', 'lightgbm', 'random_forest'}
+
+ETA = 3
+MIN_ROWS = 30
+CV_FOLDS = 3
+
+
+def row_order(X, y):
+    """Stable row order based on row content, so appended rows do not reshuffle the rest"""
+    keys = []
+    for row, label in zip(X, y):
+        keys.append(hashlib.sha1(row.tobytes() + bytes([int(label)])).hexdigest())
+    return np.argsort(np.array(keys), kind='stable')
+
+
+def data_hash(X, y):
+    """Hash of the exact rows and labels used for one evaluation"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.int64).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def load_search_cache(path):
+    if os.path.exists(path):
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+    return {}
+
+
+def save_search_cache(cache, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(cache, file)
+    os.replace(tmp_path, path)
+
+
+def budget_params(name, params, fraction):
+    """Scale the tree count of a candidate to the rung budget"""
+    scaled = dict(params)
+    if name in TREE_MEMBERS and 'n_estimators' in scaled:
+        scaled['n_estimators'] = max(10, int(round(scaled['n_estimators'] * fraction)))
+    return scaled
+
+
+def evaluate_candidate(name, params, X, y, cache, stats):
+    """Cross-validated ROC AUC of one candidate, served from the cache when possible"""
+    key = (name, json.dumps(params, sort_keys=True, default=str), data_hash(X, y))
+    if key in cache:
+        stats['cache_hits'] += 1
+        return cache[key]
+    cv = StratifiedKFold(n_splits=CV_FOLDS, shuffle=True, random_state=RANDOM_STATE)
+    score = cross_val_score(build_member(name, params), X, y, cv=cv, scoring='roc_auc').mean()
+    cache[key] = float(score)
+    stats['evaluations'] += 1
+    return float(score)
+
+
+def successive_halving(name, X, y, cache, stats):
+    """Return (best params, best full-budget score) for one ensemble member"""
+    candidates = [dict(p) for p in ParameterGrid(SEARCH_SPACES[name])]
+    n_rungs = max(1, int(np.ceil(np.log(len(candidates)) / np.log(ETA))))
+    order = row_order(X, y)
+
+    best_score = None
+    for rung in range(n_rungs + 1):
+        fraction = float(ETA) ** (rung - n_rungs)
+        n_rows = len(y) if rung == n_rungs else max(MIN_ROWS, int(len(y) * fraction))
+        rows = np.sort(order[:n_rows])
+        X_rung, y_rung = X[rows], y[rows]
+
+        scored = []
+        for params in candidates:
+            score = evaluate_candidate(name, budget_params(name, params, fraction), X_rung, y_rung, cache, stats)
+            scored.append((score, params))
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        best_score = scored[0][0]
+        if rung == n_rungs or len(scored) == 1:
+            break
+        candidates = [params for _, params in scored[:max(1, len(scored) // ETA)]]
+
+    return scored[0][1], best_score
+
+
+def search_hyperparameters(X, y, cache_file=SEARCH_CACHE_FILE):
+    """Run successive halving for every searchable member"""
+    cache = load_search_cache(cache_file)
+    stats = {'evaluations': 0, 'cache_hits': 0}
+    start_time = time.time()
+
+    best_params = {}
+    best_scores = {}
+    for name in SEARCH_SPACES:
+        best_params[name], best_scores[name] = successive_halving(name, X, y, cache, stats)
+        print(f"  {name}: roc_auc={best_scores[name]:.4f} params={best_params[name]}")
+
+    save_search_cache(cache, cache_file)
+    return {
+        'best_params': best_params,
+        'best_scores': best_scores,
+        'wall_time_seconds': round(time.time() - start_time, 3),
+        'evaluations': stats['evaluations'],
+        'cache_hits': stats['cache_hits'],
+        'search_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+# ========================================
+# TRAINING
+# ========================================
+
+def evaluate_performance(model, X_test, y_test):
+    y_pred = model.predict(X_test)
+    y_prob = model.predict_proba(X_test)[:, 1]
+    return {
+        'accuracy': round(accuracy_score(y_test, y_pred), 4),
+        'f1_score': round(f1_score(y_test, y_pred), 4),
+        'precision': round(precision_score(y_test, y_pred), 4),
+        'recall': round(recall_score(y_test, y_pred), 4),
+        'roc_auc': round(roc_auc_score(y_test, y_prob), 4),
+    }
+
+
+def save_training_rows(path, inputs, labels, ids, sources=()):
+    """Record the raw rows (6 inputs), labels and row IDs a model set was fit on, and the files already added"""
+    np.savez(path, inputs=np.asarray(inputs, dtype=np.float64), labels=np.asarray(labels, dtype=np.int64),
+             ids=np.asarray(ids, dtype=str), sources=np.asarray(list(sources), dtype=str))
+
+
+def load_training_rows(path):
+    """(inputs, labels, ids, sources) written by save_training_rows"""
+    with np.load(path) as data:
+        return data['inputs'], data['labels'], data['ids'].tolist(), data['sources'].tolist()
+
+
+def train(output_dir=MODELS_DIR, search=False, cache_file=SEARCH_CACHE_FILE):
+    """Train the ensemble and the best single model, and write all artifacts"""
+    X, y = load_training_data()
+    features = list(X.columns)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.25, random_state=RANDOM_STATE, stratify=y
+    )
+
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    member_params = {name: dict(params) for name, params in DEFAULT_PARAMS.items()}
+    search_results = None
+    if search:
+        print("🔎 Running successive-halving search...")
+        search_results = search_hyperparameters(X_train_scaled, y_train.values, cache_file)
+        member_params.update(search_results['best_params'])
+        print(f"   Search finished in {search_results['wall_time_seconds']}s "
+              f"({search_results['evaluations']} evaluations, {search_results['cache_hits']} cache hits)")
+
+    ensemble_model = build_ensemble(member_params)
+    ensemble_model.fit(X_train_scaled, y_train)
+
+    best_model = build_member('knn', member_params['knn'])
+    best_model.fit(X_train_scaled, y_train)
+
+    training_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    ensemble_metadata = {
+        'model_name': 'Ensemble Voting Classifier',
+        'model_type': 'VotingClassifier',
+        'ensemble_models': list(member_params),
+        'voting_type': 'soft',
+        'num_models': len(member_params),
+        'performance': evaluate_performance(ensemble_model, X_test_scaled, y_test),
+        'features': features,
+        'member_params': member_params,
+        'training_date': training_date,
+    }
+    if search_results:
+        ensemble_metadata['search'] = search_results
+
+    best_model_metadata = {
+        'model_name': 'KNN',
+        'model_type': 'KNeighborsClassifier',
+        'hyperparameters': str(best_model.get_params()),
+        'performance': evaluate_performance(best_model, X_test_scaled, y_test),
+        'features': features,
+        'training_date': training_date,
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    joblib.dump(ensemble_model, os.path.join(output_dir, "ensemble_model.pkl"))
+    joblib.dump(best_model, os.path.join(output_dir, "best_model_knn.pkl"))
+    joblib.dump(scaler, os.path.join(output_dir, "feature_scaler.pkl"))
+    with open(os.path.join(output_dir, "ensemble_metadata.pkl"), 'wb') as file:
+        pickle.dump(ensemble_metadata, file)
+    with open(os.path.join(output_dir, "model_metadata.pkl"), 'wb') as file:
+        pickle.dump(best_model_metadata, file)
+    save_training_rows(os.path.join(output_dir, TRAINING_ROWS_FILE), X_train[BASIC_FEATURES], y_train,
+                       [f"{os.path.basename(DATA_FILE)}:{index}" for index in X_train.index])
+
+    print(f"✅ Saved models to {output_dir}/ (ensemble accuracy {ensemble_metadata['performance']['accuracy']:.1%})")
+    # A full retrain replaces every incremental version, so the app should serve it
+    if clear_latest(output_dir):
+        print(f"ℹ️ Cleared {output_dir}/versions/LATEST - the app now serves {output_dir}/ "
+              "(earlier update versions are kept for rollback)")
+    return ensemble_metadata
+
+
+# ========================================
+# INCREMENTAL UPDATE
+# ========================================
+# New labeled companies are appended to the training rows recorded next to
+# the models (training_rows.npz) and the history is scaled with the existing
+# scaler. Companies with the same ratings as an earlier one are kept: they are
+# more evidence, not duplicates. Only replays are skipped - a file whose
+# contents were already added, or company_id values already in the history.
+# - KNN (ensemble member and best model): index extended with the new rows
+# - XGBoost / LightGBM: extra boosting rounds on top of the existing booster
+# - Random Forest: extra trees via warm start
+# - Logistic Regression / Decision Tree: cheap, refit on the full history
+# - SVM: kept as is until the next full retrain
+# The result is written as a new version under models/versions/.
+
+UPDATE_BOOSTING_ROUNDS = 20
+UPDATE_FOREST_TREES = 10
+REFIT_MEMBERS = ('logistic_regression', 'decision_tree')
+
+
+ID_COLUMN = 'company_id'
+
+
+def load_new_rows(path):
+    """Read new labeled companies: (6 raw inputs, labels, row IDs, file content hash)
+
+    Row IDs come from a company_id column if there is one, otherwise from the
+    file's content hash and the row number.
+    """
+    df = pd.read_csv(path)
+    if TARGET_COLUMN not in df.columns:
+        if 'class' not in df.columns:
+            raise ValueError(f"{path} needs a '{TARGET_COLUMN}' or 'class' column")
+        df[TARGET_COLUMN] = (df['class'] == 'non-bankruptcy').astype(int)
+    source = fingerprint_files(path)
+    if ID_COLUMN in df.columns:
+        ids = df[ID_COLUMN].astype(str).tolist()
+    else:
+        ids = [f"{os.path.basename(path)}:{source}:{i}" for i in range(len(df))]
+    return df[BASIC_FEATURES].to_numpy(dtype=np.float64), df[TARGET_COLUMN].astype(int).values, ids, source
+
+
+def update(new_rows_file, models_dir=MODELS_DIR):
+    """Fold new labeled rows into the current models and publish a new version"""
+    source_dir = latest_models_dir(models_dir)
+    ensemble_model = load_pickle_or_joblib(os.path.join(source_dir, "ensemble_model.pkl"))
+    best_model = load_pickle_or_joblib(os.path.join(source_dir, "best_model_knn.pkl"))
+    scaler = load_pickle_or_joblib(os.path.join(source_dir, "feature_scaler.pkl"))
+    with open(os.path.join(source_dir, "ensemble_metadata.pkl"), 'rb') as file:
+        ensemble_metadata = pickle.load(file)
+    with open(os.path.join(source_dir, "model_metadata.pkl"), 'rb') as file:
+        best_model_metadata = pickle.load(file)
+
+    rows_file = os.path.join(source_dir, TRAINING_ROWS_FILE)
+    if not os.path.exists(rows_file):
+        raise SystemExit(f"❌ {rows_file} not found - run a full 'python train.py' once so the training rows "
+                         "are recorded")
+    inputs_history, y_history, ids_history, sources = load_training_rows(rows_file)
+
+    inputs_new, y_new, ids_new, source = load_new_rows(new_rows_file)
+    if source in sources:
+        print(f"ℹ️ {new_rows_file} was already added (same contents) - skipped {len(y_new)} rows, models unchanged")
+        return None
+    is_new = ~np.isin(np.asarray(ids_new, dtype=str), np.asarray(ids_history, dtype=str))
+    rows_skipped = int((~is_new).sum())
+    if rows_skipped:
+        print(f"ℹ️ Skipped {rows_skipped} rows whose {ID_COLUMN} is already in the training history")
+    inputs_new, y_new = inputs_new[is_new], y_new[is_new]
+    ids_new = [row_id for row_id, keep in zip(ids_new, is_new) if keep]
+    if len(y_new) == 0:
+        print("ℹ️ No new rows to add - models unchanged")
+        return None
+
+    inputs_all = np.vstack([inputs_history, inputs_new])
+    y_all = np.concatenate([y_history, y_new])
+    X_all = scaler.transform(create_features(pd.DataFrame(inputs_all, columns=BASIC_FEATURES))
+                             [ensemble_metadata['features']])
+    y_all_encoded = ensemble_model.le_.transform(y_all)
+
+    members = ensemble_model.named_estimators_
+    knn = members['knn']
+
+    start_time = time.time()
+    knn.fit(X_all, y_all_encoded)
+    best_model.fit(X_all, y_all)
+
+    xgb = members['xgboost']
+    previous_booster = xgb.get_booster()
+    xgb.set_params(n_estimators=UPDATE_BOOSTING_ROUNDS)
+    xgb.fit(X_all, y_all_encoded, xgb_model=previous_booster)
+
+    lgbm = members['lightgbm']
+    previous_booster = lgbm.booster_
+    lgbm.set_params(n_estimators=UPDATE_BOOSTING_ROUNDS)
+    lgbm.fit(X_all, y_all_encoded, init_model=previous_booster)
+
+    forest = members['random_forest']
+    forest.set_params(warm_start=True, n_estimators=len(forest.estimators_) + UPDATE_FOREST_TREES)
+    forest.fit(X_all, y_all_encoded)
+
+    for name in REFIT_MEMBERS:
+        members[name].fit(X_all, y_all_encoded)
+    update_seconds = round(time.time() - start_time, 3)
+
+    version_dir = next_version_dir(models_dir)
+    version = os.path.basename(version_dir)
+    update_info = {
+        'version': version,
+        'parent': os.path.relpath(source_dir, models_dir),
+        'rows_added': int(len(y_new)),
+        'rows_skipped': rows_skipped,
+        'training_rows': int(len(y_all)),
+        'update_seconds': update_seconds,
+        'update_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    for metadata in (ensemble_metadata, best_model_metadata):
+        metadata['version'] = version
+        metadata['updates'] = metadata.get('updates', []) + [update_info]
+
+    joblib.dump(ensemble_model, os.path.join(version_dir, "ensemble_model.pkl"))
+    joblib.dump(best_model, os.path.join(version_dir, "best_model_knn.pkl"))
+    joblib.dump(scaler, os.path.join(version_dir, "feature_scaler.pkl"))
+    with open(os.path.join(version_dir, "ensemble_metadata.pkl"), 'wb') as file:
+        pickle.dump(ensemble_metadata, file)
+    with open(os.path.join(version_dir, "model_metadata.pkl"), 'wb') as file:
+        pickle.dump(best_model_metadata, file)
+    save_training_rows(os.path.join(version_dir, TRAINING_ROWS_FILE), inputs_all, y_all,
+                       list(ids_history) + ids_new, sources + [source])
+    publish_version(version_dir, models_dir)
+
+    print(f"✅ Added {len(y_new)} rows in {update_seconds}s - published {version} ({len(y_all)} training rows)")
+    return update_info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the bankruptcy prediction models")
+    parser.add_argument('--search', action='store_true', help="Tune XGBoost, LightGBM, RF and SVM with successive halving")
+    parser.add_argument('--output-dir', default=MODELS_DIR, help="Where to write the model artifacts")
+    parser.add_argument('--cache-file', default=SEARCH_CACHE_FILE, help="On-disk cache of search scores")
+    parser.add_argument('--update', metavar='CSV', help="Append new labeled rows to the current models instead of retraining")
+    args = parser.parse_args()
+    if args.update:
+        update(args.update, models_dir=args.output_dir)
+        return
+    train(output_dir=args.output_dir, search=args.search, cache_file=args.cache_file)
+
+
+if __name__ == "__main__":
+    main()